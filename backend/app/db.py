@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -6,13 +6,53 @@ import os
 # SQLite database
 # 경로는 실행 위치에 따라 조정 (backend 디렉토리에서 실행 가정)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, "app", "tasting_notes.db")
+DB_PATH = os.environ.get("TASTING_NOTES_DB_PATH", os.path.join(BASE_DIR, "app", "tasting_notes.db"))
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+# SQLite 연결 프로파일 (연결마다 PRAGMA 적용, 환경 변수로 조정 가능)
+# - WAL: 쓰기 중에도 읽기가 막히지 않음
+# - busy_timeout: 잠금 충돌 시 바로 실패하지 않고 대기
+# - synchronous=NORMAL: WAL에서는 커밋마다 fsync하지 않아도 손상 위험 없음
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": -int(os.environ.get("SQLITE_CACHE_SIZE_KB", "20000")),  # 음수 = KiB 단위
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.environ.get("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# SQLite는 쓰기가 하나씩만 가능하므로 큰 풀은 의미가 없음 (읽기 동시성만큼)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "5"))
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Apply PRAGMA settings to a new DBAPI connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, pragmas=SQLITE_PRAGMAS, pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+    """Create an engine whose connections get the given PRAGMA profile (None = SQLite defaults)"""
+    db_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        pool_size=pool_size,
+        max_overflow=max_overflow
+    )
+    if pragmas:
+        @event.listens_for(db_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            apply_sqlite_pragmas(dbapi_connection, pragmas)
+    return db_engine
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -30,6 +70,32 @@ def get_db():
 
 def init_db():
     """Initialize database tables"""
-    from app.models import Note, NoteKeyword, VocabularyTerm, UserTerm
+    from app.models import Note, NoteKeyword, VocabularyTerm, UserTerm, AppMeta, FeaturedPick, ProfileStat, ProfileKeywordStat, KeywordTerm, KeywordCooccurrence
     Base.metadata.create_all(bind=engine)
+    
+    # 예전 DB의 note_keywords를 term_id만 저장하는 형태로 재작성 (인덱스보다 먼저)
+    from app.services.term_dictionary import TermDictionary
+    TermDictionary.migrate_note_keywords(engine)
+    # 예전 DB의 중복 커스텀 키워드 병합 및 user_terms 재작성 (unique 인덱스보다 먼저)
+    from app.services.keyword_service import KeywordService
+    KeywordService.migrate_user_terms(engine)
+    
+    # create_all은 이미 있는 테이블에 새 인덱스를 추가하지 않으므로 따로 확인
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    # Full-text search index (FTS5 virtual table, not an ORM model)
+    from app.services.search_service import SearchService
+    SearchService.init_index(engine)
+
+    # 기본 어휘 / 커스텀 키워드를 키워드 사전에 등록
+    TermDictionary.backfill(engine)
+
+    # 증류소 / 캐스크 프로필 집계 (처음 한 번 기존 노트로 계산)
+    from app.services.profile_service import ProfileService
+    ProfileService.init_stats(engine)
 
+    # 함께 쓰인 키워드 집계
+    from app.services.cooccurrence_service import CooccurrenceService
+    CooccurrenceService.init_counts(engine)
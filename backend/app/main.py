@@ -1,32 +1,57 @@
 from fastapi import FastAPI, Request, Form, File, UploadFile, HTTPException, Depends
-from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response, StreamingResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime, date
+import asyncio
+import io
 import os
-import random
 import json
 
-from app.db import get_db, init_db
+from app.db import get_db, init_db, SessionLocal
 from app.models import Note, NoteKeyword, VocabularyTerm, UserTerm
 from app.schemas import NoteCreate, NoteUpdate, KeywordDetail
 from app.services.note_service import NoteService
-from app.services.keyword_service import KeywordService
+from app.services.keyword_service import KeywordService, USER_TERMS_PAGE_SIZE, MAX_USER_TERMS_PAGE_SIZE
 from app.services.featured_service import FeaturedService
+from app.services.similar_service import SimilarService, SIMILAR_TOP_K, MAX_SIMILAR
+from app.services.profile_service import ProfileService, PROFILE_DIMENSIONS, DEFAULT_TOP_KEYWORDS, MAX_TOP_KEYWORDS
+from app.services.board_service import BoardService, PAGE_SIZE
+from app.services.vocabulary_cache import VocabularyCache
+from app.services.suggest_service import KeywordSuggestService
+from app.services.cooccurrence_service import CooccurrenceService, DEFAULT_RELATED, MAX_RELATED
+from app.services.export_service import ExportService, EXPORT_FORMATS, EXPORT_MEDIA_TYPES
+from app.services.image_store import ImageStore, UploadTooLarge, UPLOADS_DIR, MAX_UPLOAD_BYTES
+from app.services.thumbnail_service import ThumbnailService
+from app.services.upload_gc import UploadGC, UPLOAD_GC_INTERVAL_SECONDS
+from app.services.import_service import ImportService, DEFAULT_BATCH_SIZE, detect_format, iter_records
+from app.query_budget import query_budget, query_budget_middleware
+from app.static_files import CachedStaticFiles, StaticManifest, CONTENT_ADDRESSED_RE, FINGERPRINTED_RE, accepted_encodings, etag_matches
 
 app = FastAPI(title="Whisky Tasting Note MVP")
 
+# 요청별 SQL 실행 수 집계 (route별 @query_budget 초과 시 경고/테스트 실패)
+app.middleware("http")(query_budget_middleware)
+
 # Static files and templates
 # 경로는 실행 위치에 따라 조정 (backend 디렉토리에서 실행 가정)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 STATIC_DIR = os.path.join(BASE_DIR, "app", "static")
-UPLOADS_DIR = os.path.join(BASE_DIR, "app", "uploads")
 TEMPLATES_DIR = os.path.join(BASE_DIR, "app", "templates")
 
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
-app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
+# 해시가 이름에 들어간 파일(build_static.py 결과, sha256 업로드)은 1년 immutable 캐시
+app.mount("/static", CachedStaticFiles(
+    directory=STATIC_DIR,
+    immutable=lambda path: bool(FINGERPRINTED_RE.match(path)),
+), name="static")
+app.mount("/uploads", CachedStaticFiles(
+    directory=UPLOADS_DIR,
+    immutable=lambda path: bool(CONTENT_ADDRESSED_RE.match(path)),
+    cache_control="public, max-age=86400",
+), name="uploads")
+static_manifest = StaticManifest(STATIC_DIR)
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
 
 # Icon mapping function for templates
@@ -45,6 +70,8 @@ def get_icon_emoji(icon_key):
 
 # Register function in Jinja2 environment
 templates.env.globals['get_icon_emoji'] = get_icon_emoji
+templates.env.globals['image_sources'] = ThumbnailService.sources
+templates.env.globals['static_url'] = static_manifest.url
 
 # Create uploads directory if not exists
 os.makedirs(UPLOADS_DIR, exist_ok=True)
@@ -56,88 +83,109 @@ async def startup_event():
     # Seed vocabulary terms if not already seeded
     from app.seed import seed_vocabulary
     seed_vocabulary()
+    # 예전 버전이 uploads에 남긴 Export 임시 파일 정리
+    ExportService.cleanup_legacy_files(UPLOADS_DIR)
+    if UPLOAD_GC_INTERVAL_SECONDS > 0:
+        app.state.upload_gc_task = asyncio.create_task(upload_gc_loop())
+
+
+async def upload_gc_loop():
+    """참조되지 않는 업로드 파일 정리 (UPLOAD_GC_INTERVAL_HOURS 주기)"""
+    while True:
+        await asyncio.sleep(UPLOAD_GC_INTERVAL_SECONDS)
+        await run_in_threadpool(UploadGC.run_with_session)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    task = getattr(app.state, "upload_gc_task", None)
+    if task is not None:
+        task.cancel()
+    ThumbnailService.shutdown()
+
+async def save_image(image: UploadFile) -> Optional[str]:
+    """Store an uploaded image off the event loop; 413 when it exceeds the size cap"""
+    try:
+        stored = await run_in_threadpool(ImageStore.save, image.file, image.filename)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if stored is None:
+        return None
+    # 썸네일/중간 크기는 프로세스 풀에서 생성 (응답을 기다리게 하지 않음)
+    # 같은 사진이 이미 있으면 처음 저장할 때 요청했으므로 다시 만들지 않음
+    if stored.created:
+        ThumbnailService.schedule(stored.image_path)
+    return stored.image_path
+
+
+def release_image(db: Session, image_path: Optional[str]):
+    """Delete an unreferenced original together with its derivatives"""
+    if ImageStore.release(db, image_path):
+        ThumbnailService.forget(image_path)
 
-# Featured notes cache (하루 고정 랜덤)
-featured_cache = {"date": None, "notes": []}
 
-def get_featured_notes(db: Session):
-    """하루 동안 고정되는 랜덤 5건"""
-    today = date.today()
-    if featured_cache["date"] != today:
-        featured_cache["date"] = today
-        all_notes = db.query(Note).filter(Note.is_draft == False).all()
-        if len(all_notes) <= 5:
-            featured_cache["notes"] = [n.id for n in all_notes]
-        else:
-            featured_cache["notes"] = [n.id for n in random.sample(all_notes, 5)]
-    return featured_cache["notes"]
+# 노트 작성/수정 폼: Content-Length가 이미지 최대 크기를 넘으면 본문을 읽기 전에 거절
+NOTE_FORM_OVERHEAD_BYTES = 1024 * 1024
+
+@app.middleware("http")
+async def limit_note_form_size(request: Request, call_next):
+    path = request.url.path
+    is_note_form = (request.method == "POST" and path == "/api/notes") or (
+        request.method == "PUT" and path.startswith("/api/notes/")
+    )
+    length = request.headers.get("content-length")
+    if is_note_form and length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES + NOTE_FORM_OVERHEAD_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Image exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)}MB"},
+        )
+    return await call_next(request)
 
 
 # ========== SSR Routes ==========
+# DB를 사용하는 라우트는 동기 함수(def)로 두어 FastAPI가 스레드풀에서 실행하도록 한다.
+# 업로드를 await해야 하는 라우트는 async로 두고 DB 작업만 run_in_threadpool로 넘긴다.
 
 @app.get("/", response_class=HTMLResponse)
-async def board_page(
+@query_budget(9)
+def board_page(
     request: Request,
     view: str = "card",
-    sort_by: str = "created_at",
+    sort_by: Optional[str] = None,
     sort_order: str = "desc",
     search: Optional[str] = None,
     search_mode: str = "AND",
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
     db: Session = Depends(get_db)
 ):
     """게시판 페이지"""
-    # Featured notes
-    featured_ids = get_featured_notes(db)
-    featured_notes = db.query(Note).filter(
-        Note.id.in_(featured_ids),
-        Note.is_draft == False
-    ).all() if featured_ids else []
-    
-    # Main notes query
-    query = db.query(Note).filter(Note.is_draft == False)
-    
-    # Search
-    if search:
-        search_terms = [s.strip() for s in search.split() if s.strip()]
-        if search_terms:
-            if search_mode == "AND":
-                for term in search_terms:
-                    query = query.filter(
-                        (Note.name.contains(term)) |
-                        (Note.distillery.contains(term)) |
-                        (Note.id.in_(
-                            db.query(NoteKeyword.note_id).filter(
-                                NoteKeyword.term.contains(term)
-                            )
-                        ))
-                    )
-            else:  # OR
-                or_conditions = []
-                for term in search_terms:
-                    or_conditions.append(Note.name.contains(term))
-                    or_conditions.append(Note.distillery.contains(term))
-                    or_conditions.append(Note.id.in_(
-                        db.query(NoteKeyword.note_id).filter(
-                            NoteKeyword.term.contains(term)
-                        )
-                    ))
-                from sqlalchemy import or_
-                query = query.filter(or_(*or_conditions))
-    
-    # Sort
-    if sort_by == "name":
-        query = query.order_by(Note.name.asc() if sort_order == "asc" else Note.name.desc())
-    else:  # created_at
-        query = query.order_by(Note.created_at.asc() if sort_order == "asc" else Note.created_at.desc())
-    
-    notes = query.all()
+    # Featured notes (하루 한 번 하는 추천 선정도 예산에 포함)
+    featured_day = FeaturedService.ensure_picks(db)
+    featured_notes = FeaturedService.get_featured_notes(db, featured_day)
+    
+    # Main notes (검색 + 정렬 + 키셋 페이지네이션)
+    try:
+        page = BoardService.get_page(
+            db,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            search=search,
+            search_mode=search_mode,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return templates.TemplateResponse("board.html", {
         "request": request,
         "featured_notes": featured_notes,
-        "notes": notes,
+        "notes": page.notes,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
         "view": view,
-        "sort_by": sort_by,
+        "sort_by": page.sort_by,
         "sort_order": sort_order,
         "search": search or "",
         "search_mode": search_mode
@@ -145,64 +193,15 @@ async def board_page(
 
 
 @app.get("/notes/new", response_class=HTMLResponse)
-async def create_note_page(request: Request, db: Session = Depends(get_db)):
+@query_budget(2)
+def create_note_page(request: Request, db: Session = Depends(get_db)):
     """노트 작성 페이지"""
-    # Get vocabulary terms organized by hierarchy
-    def get_hierarchical_terms(scope):
-        vocab = db.query(VocabularyTerm).filter(VocabularyTerm.scope == scope).order_by(VocabularyTerm.level, VocabularyTerm.category, VocabularyTerm.subcategory).all()
-        user = db.query(UserTerm).filter(UserTerm.scope == scope).all()
-        
-        # Organize into hierarchical structure
-        hierarchy = {}
-        categories = {}  # Level 1 terms
-        subcategories = {}  # Level 2 terms by category
-        
-        for term in vocab:
-            cat = term.category or "기타"
-            subcat = term.subcategory or "일반"
-            
-            # Store category (level 1)
-            if term.level == 1:
-                categories[cat] = {
-                    "term": term.term,
-                    "icon_key": term.icon_key
-                }
-            
-            # Store subcategory (level 2)
-            if term.level == 2:
-                if cat not in subcategories:
-                    subcategories[cat] = {}
-                subcategories[cat][subcat] = {
-                    "term": term.term,
-                    "icon_key": term.icon_key
-                }
-            
-            # Organize detail keywords (level 3)
-            if cat not in hierarchy:
-                hierarchy[cat] = {}
-            if subcat not in hierarchy[cat]:
-                hierarchy[cat][subcat] = []
-            
-            if term.level == 3:
-                # Convert VocabularyTerm to dict for JSON serialization
-                hierarchy[cat][subcat].append({
-                    "term": term.term,
-                    "icon_key": term.icon_key
-                })
-        
-        # Convert UserTerm to dict for JSON serialization
-        user_dicts = [{"term": u.term, "icon_key": u.icon_key} for u in user]
-        
-        return {
-            "hierarchy": hierarchy, 
-            "user_terms": user_dicts,
-            "categories": categories,
-            "subcategories": subcategories
-        }
-    
-    nose_data = get_hierarchical_terms("nose")
-    palate_data = get_hierarchical_terms("palate")
-    finish_data = get_hierarchical_terms("finish")
+    # Vocabulary hierarchy (프로세스 공유 캐시)
+    vocabulary = VocabularyCache.get(db)
+    
+    nose_data = vocabulary.scope("nose")
+    palate_data = vocabulary.scope("palate")
+    finish_data = vocabulary.scope("finish")
     
     return templates.TemplateResponse("note_form.html", {
         "request": request,
@@ -210,85 +209,66 @@ async def create_note_page(request: Request, db: Session = Depends(get_db)):
         "nose_data": nose_data,
         "palate_data": palate_data,
         "finish_data": finish_data,
+        "vocabulary_version": vocabulary.version,
         "mode": "create"
     })
 
 
 @app.get("/notes/{note_id}", response_class=HTMLResponse)
-async def note_detail_page(
+@query_budget(4)
+def note_detail_page(
     request: Request,
     note_id: int,
     db: Session = Depends(get_db)
 ):
     """노트 상세 페이지"""
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = NoteService.get_note(db, note_id, with_keywords=True)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
-    # Get keywords grouped by scope
-    keywords = db.query(NoteKeyword).filter(NoteKeyword.note_id == note_id).order_by(NoteKeyword.position).all()
-    nose_keywords = [k for k in keywords if k.scope == "nose"]
-    palate_keywords = [k for k in keywords if k.scope == "palate"]
-    finish_keywords = [k for k in keywords if k.scope == "finish"]
+    # Keywords grouped by scope (selectinload로 이미 로드됨)
+    keywords = NoteService.keywords_by_scope(note)
+    
+    # 비슷한 노트 (처음 한 번 하는 인덱스 빌드도 예산에 포함)
+    similar_notes = SimilarService.similar_notes(db, note)
     
     return templates.TemplateResponse("note_detail.html", {
         "request": request,
         "note": note,
-        "nose_keywords": nose_keywords,
-        "palate_keywords": palate_keywords,
-        "finish_keywords": finish_keywords
+        "nose_keywords": keywords["nose"],
+        "palate_keywords": keywords["palate"],
+        "finish_keywords": keywords["finish"],
+        "similar_notes": similar_notes
     })
 
 
 @app.get("/notes/{note_id}/edit", response_class=HTMLResponse)
-async def edit_note_page(
+@query_budget(4)
+def edit_note_page(
     request: Request,
     note_id: int,
     db: Session = Depends(get_db)
 ):
     """노트 수정 페이지"""
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = NoteService.get_note(db, note_id, with_keywords=True)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
-    # Get keywords grouped by scope
-    keywords = db.query(NoteKeyword).filter(NoteKeyword.note_id == note_id).order_by(NoteKeyword.position).all()
-    nose_keywords = [{"term": k.term, "icon_key": k.icon_key, "detail_text": k.detail_text, "position": k.position, "source_type": k.source_type} for k in keywords if k.scope == "nose"]
-    palate_keywords = [{"term": k.term, "icon_key": k.icon_key, "detail_text": k.detail_text, "position": k.position, "source_type": k.source_type} for k in keywords if k.scope == "palate"]
-    finish_keywords = [{"term": k.term, "icon_key": k.icon_key, "detail_text": k.detail_text, "position": k.position, "source_type": k.source_type} for k in keywords if k.scope == "finish"]
-    
-    # Get vocabulary terms organized by hierarchy
-    def get_hierarchical_terms(scope):
-        vocab = db.query(VocabularyTerm).filter(VocabularyTerm.scope == scope).order_by(VocabularyTerm.level, VocabularyTerm.category, VocabularyTerm.subcategory).all()
-        user = db.query(UserTerm).filter(UserTerm.scope == scope).all()
-        
-        # Organize into hierarchical structure
-        hierarchy = {}
-        for term in vocab:
-            cat = term.category or "기타"
-            subcat = term.subcategory or "일반"
-            
-            if cat not in hierarchy:
-                hierarchy[cat] = {}
-            if subcat not in hierarchy[cat]:
-                hierarchy[cat][subcat] = []
-            
-            # Only add level 3 (detail keywords) to the lists
-            if term.level == 3:
-                # Convert VocabularyTerm to dict for JSON serialization
-                hierarchy[cat][subcat].append({
-                    "term": term.term,
-                    "icon_key": term.icon_key
-                })
-        
-        # Convert UserTerm to dict for JSON serialization
-        user_dicts = [{"term": u.term, "icon_key": u.icon_key} for u in user]
-        
-        return {"hierarchy": hierarchy, "user_terms": user_dicts}
-    
-    nose_data = get_hierarchical_terms("nose")
-    palate_data = get_hierarchical_terms("palate")
-    finish_data = get_hierarchical_terms("finish")
+    # Keywords grouped by scope, as dicts for JSON serialization
+    keywords = {
+        scope: [{"term": k.term, "icon_key": k.icon_key, "detail_text": k.detail_text, "position": k.position, "source_type": k.source_type} for k in scope_keywords]
+        for scope, scope_keywords in NoteService.keywords_by_scope(note).items()
+    }
+    nose_keywords = keywords["nose"]
+    palate_keywords = keywords["palate"]
+    finish_keywords = keywords["finish"]
+    
+    # Vocabulary hierarchy (프로세스 공유 캐시)
+    vocabulary = VocabularyCache.get(db)
+    
+    nose_data = vocabulary.scope("nose")
+    palate_data = vocabulary.scope("palate")
+    finish_data = vocabulary.scope("finish")
     
     return templates.TemplateResponse("note_form.html", {
         "request": request,
@@ -299,6 +279,7 @@ async def edit_note_page(
         "nose_data": nose_data,
         "palate_data": palate_data,
         "finish_data": finish_data,
+        "vocabulary_version": vocabulary.version,
         "mode": "edit"
     })
 
@@ -333,15 +314,10 @@ async def create_note(
     except:
         keywords_data = []
     
-    # Save image
+    # Save image (청크 단위 스트리밍, 같은 사진은 한 번만 저장)
     image_path = None
     if image:
-        filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{image.filename}"
-        filepath = os.path.join(UPLOADS_DIR, filename)
-        with open(filepath, "wb") as f:
-            content = await image.read()
-            f.write(content)
-        image_path = filename
+        image_path = await save_image(image)
     
     # Parse bottle_opened_at
     bottle_opened_at_date = None
@@ -351,7 +327,8 @@ async def create_note(
         except:
             pass
     
-    note = NoteService.create_note(
+    note = await run_in_threadpool(
+        NoteService.create_note,
         db=db,
         name=name,
         distillery=distillery,
@@ -375,6 +352,35 @@ async def create_note(
     return {"id": note.id, "message": "Note created successfully"}
 
 
+@app.post("/api/notes/bulk")
+def bulk_import_notes(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    batch_size: int = Form(DEFAULT_BATCH_SIZE),
+    db: Session = Depends(get_db)
+):
+    """노트 일괄 가져오기 (JSONL / CSV)"""
+    try:
+        fmt = detect_format(file.filename, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # 업로드 파일을 한 줄씩 읽어서 배치 단위로 저장 (전체를 메모리에 올리지 않음)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        result = ImportService.import_notes(db, iter_records(stream, fmt), batch_size=batch_size)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    finally:
+        stream.detach()
+    
+    return {
+        "imported": result.imported,
+        "failed": len(result.errors),
+        "errors": [{"row": e.row, "error": e.error} for e in result.errors],
+    }
+
+
 @app.put("/api/notes/{note_id}")
 async def update_note(
     note_id: int,
@@ -398,7 +404,7 @@ async def update_note(
     db: Session = Depends(get_db)
 ):
     """노트 수정"""
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = await run_in_threadpool(NoteService.get_note, db, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
@@ -409,21 +415,10 @@ async def update_note(
         keywords_data = []
     
     # Save image if new one uploaded
-    image_path = note.image_path
+    old_image_path = note.image_path
+    image_path = old_image_path
     if image:
-        # Delete old image if exists
-        if note.image_path and os.path.exists(os.path.join(UPLOADS_DIR, note.image_path)):
-            try:
-                os.remove(os.path.join(UPLOADS_DIR, note.image_path))
-            except:
-                pass
-        
-        filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{image.filename}"
-        filepath = os.path.join(UPLOADS_DIR, filename)
-        with open(filepath, "wb") as f:
-            content = await image.read()
-            f.write(content)
-        image_path = filename
+        image_path = await save_image(image) or old_image_path
     
     # Parse bottle_opened_at
     bottle_opened_at_date = None
@@ -433,7 +428,8 @@ async def update_note(
         except:
             pass
     
-    NoteService.update_note(
+    await run_in_threadpool(
+        NoteService.update_note,
         db=db,
         note=note,
         name=name,
@@ -455,149 +451,270 @@ async def update_note(
         keywords_data=keywords_data
     )
     
+    # 이전 이미지는 다른 노트가 참조하지 않을 때만 삭제
+    if old_image_path and old_image_path != image_path:
+        await run_in_threadpool(release_image, db, old_image_path)
+    
     return {"id": note.id, "message": "Note updated successfully"}
 
 
 @app.delete("/api/notes/{note_id}")
-async def delete_note(note_id: int, db: Session = Depends(get_db)):
+def delete_note(note_id: int, db: Session = Depends(get_db)):
     """노트 삭제"""
     note = db.query(Note).filter(Note.id == note_id).first()
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
-    # Delete image if exists
-    if note.image_path and os.path.exists(os.path.join(UPLOADS_DIR, note.image_path)):
-        try:
-            os.remove(os.path.join(UPLOADS_DIR, note.image_path))
-        except:
-            pass
+    image_path = note.image_path
+    NoteService.delete_note(db, note)
     
-    db.delete(note)
-    db.commit()
+    # Delete image if no other note uses it
+    release_image(db, image_path)
     
     return {"message": "Note deleted successfully"}
 
 
+@app.get("/api/notes/page")
+@query_budget(3)
+def board_notes_page(
+    view: str = "card",
+    sort_by: Optional[str] = None,
+    sort_order: str = "desc",
+    search: Optional[str] = None,
+    search_mode: str = "AND",
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    db: Session = Depends(get_db)
+):
+    """게시판 무한 스크롤용 HTML 조각"""
+    try:
+        page = BoardService.get_page(
+            db,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            search=search,
+            search_mode=search_mode,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    html = templates.get_template("note_items.html").render(notes=page.notes, view=view)
+    return {
+        "html": html,
+        "count": len(page.notes),
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor
+    }
+
+
+@app.get("/api/vocabulary")
+@query_budget(2)
+def vocabulary_json(request: Request, v: Optional[str] = None, db: Session = Depends(get_db)):
+    """키워드 계층 구조 JSON (ETag + 미리 압축된 본문)"""
+    vocabulary = VocabularyCache.get(db)
+    
+    # ?v=<version>으로 요청하면 내용이 바뀌지 않으므로 장기 캐시, 그 외에는 ETag로 재검증
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable" if v == vocabulary.version else "no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    
+    accepted = accepted_encodings(request.headers)
+    if vocabulary.payload_br is not None and "br" in accepted:
+        body, encoding = vocabulary.payload_br, "br"
+    elif "gzip" in accepted:
+        body, encoding = vocabulary.payload_gzip, "gzip"
+    else:
+        body, encoding = vocabulary.payload, None
+    
+    # 인코딩별로 다른 바이트이므로 strong ETag도 인코딩마다 구분
+    headers["ETag"] = f'"{vocabulary.version}-{encoding}"' if encoding else f'"{vocabulary.version}"'
+    if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.post("/api/keywords/custom")
-async def create_custom_keyword(
+def create_custom_keyword(
     scope: str = Form(...),
     term: str = Form(...),
     icon_key: Optional[str] = Form(None),
     db: Session = Depends(get_db)
 ):
-    """커스텀 키워드 생성"""
-    user_term = UserTerm(scope=scope, term=term, icon_key=icon_key or "custom")
-    db.add(user_term)
-    db.commit()
-    db.refresh(user_term)
+    """커스텀 키워드 생성 (정규화한 term이 같으면 기존 키워드 반환)"""
+    try:
+        user_term, created = KeywordService.create_user_term(db, scope=scope, term=term, icon_key=icon_key or "custom")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "id": user_term.id,
         "scope": user_term.scope,
         "term": user_term.term,
-        "icon_key": user_term.icon_key
+        "icon_key": user_term.icon_key,
+        "created": created
     }
 
 
+@app.get("/api/keywords/custom")
+@query_budget(1)
+def list_custom_keywords(
+    scope: str,
+    after_count: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: int = USER_TERMS_PAGE_SIZE,
+    db: Session = Depends(get_db)
+):
+    """커스텀 키워드 목록 (사용 빈도순, after_count / after_id 다음부터)"""
+    limit = max(1, min(limit, MAX_USER_TERMS_PAGE_SIZE))
+    after = (after_count, after_id) if after_count is not None and after_id is not None else None
+    user_terms = KeywordService.get_user_terms(db, scope, limit=limit + 1, after=after)
+    has_more = len(user_terms) > limit
+    user_terms = user_terms[:limit]
+    
+    next_page = None
+    if has_more:
+        next_page = {"after_count": user_terms[-1].usage_count, "after_id": user_terms[-1].id}
+    return {
+        "scope": scope,
+        "terms": [
+            {"id": t.id, "term": t.term, "icon_key": t.icon_key, "count": t.usage_count}
+            for t in user_terms
+        ],
+        "next": next_page
+    }
+
+
+@app.get("/api/keywords/suggest")
+@query_budget(3)
+def suggest_keywords(
+    scope: str,
+    q: str = "",
+    limit: int = 10,
+    offset: int = 0,
+    db: Session = Depends(get_db)
+):
+    """키워드 자동완성 (음절 / 자모 / 초성, 사용 빈도순, offset으로 다음 페이지)"""
+    suggestions = KeywordSuggestService.suggest(db, scope, q, limit=max(1, min(limit, 50)), offset=max(0, offset))
+    return {"scope": scope, "query": q, "suggestions": suggestions}
+
+
+@app.get("/api/keywords/related")
+@query_budget(2)
+def related_keywords(
+    scope: str,
+    term: str,
+    limit: int = DEFAULT_RELATED,
+    db: Session = Depends(get_db)
+):
+    """같은 노트에서 함께 자주 쓰인 키워드 (함께 쓰인 노트 수 순, lift 포함)"""
+    related = CooccurrenceService.related(db, scope, term, limit=max(1, min(limit, MAX_RELATED)))
+    return {"scope": scope, "term": term, "related": related}
+
+
+@app.get("/api/notes/{note_id}/similar")
+@query_budget(4)
+def similar_notes(note_id: int, k: int = SIMILAR_TOP_K, db: Session = Depends(get_db)):
+    """비슷한 노트 (키워드 벡터 코사인 유사도 상위 k개)"""
+    if not SimilarService.available():
+        raise HTTPException(status_code=503, detail="Similar notes require NumPy")
+    note = NoteService.get_note(db, note_id, with_keywords=True)
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    
+    results = SimilarService.similar_notes(db, note, k=max(1, min(k, MAX_SIMILAR)))
+    return {
+        "note_id": note_id,
+        "similar": [
+            {
+                "id": similar.id,
+                "name": similar.name,
+                "distillery": similar.distillery,
+                "score": similar.score,
+                "image_path": similar.image_path,
+                "similarity": round(similarity, 4),
+            }
+            for similar, similarity in results
+        ],
+    }
+
+
+@app.get("/api/stats/profile")
+@query_budget(2)
+def profile_stats(
+    dimension: str = "distillery",
+    value: Optional[str] = None,
+    limit: int = DEFAULT_TOP_KEYWORDS,
+    db: Session = Depends(get_db)
+):
+    """증류소 / 캐스크 종류별 Flavor 프로필 (value가 없으면 노트가 많은 순서로 목록)"""
+    if dimension not in PROFILE_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of {', '.join(PROFILE_DIMENSIONS)}")
+    limit = max(1, min(limit, MAX_TOP_KEYWORDS))
+    
+    if not value or not value.strip():
+        return {"dimension": dimension, "values": ProfileService.top_values(db, dimension, limit=limit)}
+    
+    profile = ProfileService.get_profile(db, dimension, value.strip(), limit=limit)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No published notes for this profile")
+    return profile
+
+
+@app.get("/api/notes/export")
+def export_notes(
+    format: str = "jsonl",
+    sort_by: Optional[str] = None,
+    sort_order: str = "desc",
+    search: Optional[str] = None,
+    search_mode: str = "AND",
+    include_drafts: bool = True,
+):
+    """전체(또는 검색 결과) 노트 스트리밍 Export (JSONL / CSV / ZIP, 임시저장 포함)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    
+    def generate():
+        # 응답이 끝날 때까지 커서를 유지해야 하므로 요청 의존성과 별도의 세션 사용
+        db = SessionLocal()
+        try:
+            yield from ExportService.stream(
+                db,
+                format,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                search=search,
+                search_mode=search_mode,
+                include_drafts=include_drafts,
+            )
+        finally:
+            db.close()
+    
+    filename = f"tasting_notes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        generate(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": ExportService.content_disposition(filename)},
+    )
+
+
 @app.get("/notes/{note_id}/export.txt")
-async def export_note(note_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+def export_note(note_id: int, db: Session = Depends(get_db)):
     """노트 Export (.txt)"""
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = NoteService.get_note(db, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
-    # Get keywords grouped by scope
-    keywords = db.query(NoteKeyword).filter(NoteKeyword.note_id == note_id).order_by(NoteKeyword.position).all()
-    nose_keywords = [k for k in keywords if k.scope == "nose"]
-    palate_keywords = [k for k in keywords if k.scope == "palate"]
-    finish_keywords = [k for k in keywords if k.scope == "finish"]
-    
-    # Generate text content
-    lines = []
-    lines.append("=" * 50)
-    lines.append(f"위스키 테이스팅 노트")
-    lines.append("=" * 50)
-    lines.append("")
-    lines.append(f"이름: {note.name}")
-    if note.distillery:
-        lines.append(f"증류소: {note.distillery}")
-    if note.age:
-        lines.append(f"숙성년도: {note.age}년")
-    if note.cask_type:
-        lines.append(f"캐스크 종류: {note.cask_type}")
-    if note.abv:
-        lines.append(f"도수: {note.abv}%")
-    if note.is_single_cask and note.cask_info:
-        lines.append(f"싱글 캐스크: {note.cask_info}")
-    if note.bottle_remaining:
-        lines.append(f"잔여량: {note.bottle_remaining}")
-    if note.bottle_opened_at:
-        lines.append(f"개봉일: {note.bottle_opened_at}")
-    lines.append("")
-    lines.append("-" * 50)
-    lines.append("Nose (향)")
-    lines.append("-" * 50)
-    if nose_keywords:
-        lines.append("키워드:")
-        for kw in nose_keywords:
-            lines.append(f"• {kw.term}")
-    if note.nose_comment:
-        lines.append("")
-        lines.append("한 줄 총평:")
-        lines.append(note.nose_comment)
-    if not nose_keywords and not note.nose_comment:
-        lines.append("(내용 없음)")
-    lines.append("")
-    lines.append("-" * 50)
-    lines.append("Palate (맛)")
-    lines.append("-" * 50)
-    if palate_keywords:
-        lines.append("키워드:")
-        for kw in palate_keywords:
-            lines.append(f"• {kw.term}")
-    if note.palate_comment:
-        lines.append("")
-        lines.append("한 줄 총평:")
-        lines.append(note.palate_comment)
-    if not palate_keywords and not note.palate_comment:
-        lines.append("(내용 없음)")
-    lines.append("")
-    lines.append("-" * 50)
-    lines.append("Finish (여운)")
-    lines.append("-" * 50)
-    if finish_keywords:
-        lines.append("키워드:")
-        for kw in finish_keywords:
-            lines.append(f"• {kw.term}")
-    if note.finish_comment:
-        lines.append("")
-        lines.append("한 줄 총평:")
-        lines.append(note.finish_comment)
-    if not finish_keywords and not note.finish_comment:
-        lines.append("(내용 없음)")
-    lines.append("")
-    lines.append("-" * 50)
-    lines.append("총평")
-    lines.append("-" * 50)
-    if note.overall_comment:
-        lines.append(note.overall_comment)
-    if note.score is not None:
-        lines.append(f"점수: {note.score}/100")
-    lines.append("")
-    lines.append(f"작성일: {note.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
-    lines.append("=" * 50)
-    
-    content = "\n".join(lines)
-    
-    # Save to temporary file
-    filename = f"note_{note_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-    filepath = os.path.join(UPLOADS_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(content)
-    
-    return FileResponse(
-        filepath,
+    # 메모리에서 렌더링 (같은 버전의 노트는 캐시에서 바로 응답)
+    rendered = ExportService.note_text(note)
+    return Response(
+        content=rendered.content,
         media_type="text/plain",
-        filename=f"{note.name.replace(' ', '_')}_tasting_note.txt"
+        headers={"Content-Disposition": ExportService.content_disposition(rendered.filename)},
     )
-
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import desc, Column, Integer, String, Float, Boolean, Text, Date, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db import Base
@@ -6,6 +6,12 @@ from app.db import Base
 
 class Note(Base):
     __tablename__ = "notes"
+    __table_args__ = (
+        # 게시판: is_draft = 0 필터 + 정렬 컬럼 + id (키셋 페이지네이션 순서)
+        Index("ix_notes_draft_created_id", "is_draft", "created_at", "id"),
+        Index("ix_notes_draft_name_id", "is_draft", "name", "id"),
+        Index("ix_notes_distillery", "distillery"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -22,27 +28,48 @@ class Note(Base):
     finish_comment = Column(Text, nullable=True)
     overall_comment = Column(Text, nullable=True)
     score = Column(Integer, nullable=True)
-    image_path = Column(String, nullable=True)
+    image_path = Column(String, nullable=True, index=True)  # 참조 수 확인용 인덱스
     is_draft = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    keywords = relationship("NoteKeyword", back_populates="note", cascade="all, delete-orphan")
+    keywords = relationship(
+        "NoteKeyword",
+        back_populates="note",
+        cascade="all, delete-orphan",
+        order_by="NoteKeyword.position"
+    )
 
 
 class NoteKeyword(Base):
     __tablename__ = "note_keywords"
+    __table_args__ = (
+        # 상세/수정/Export: note_id로 찾고 scope, position 순서로 읽음
+        Index("ix_note_keywords_note_scope_position", "note_id", "scope", "position"),
+        # 키워드(term id)별 노트 조회 및 사용 빈도 집계
+        Index("ix_note_keywords_term_id_note", "term_id", "note_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     note_id = Column(Integer, ForeignKey("notes.id"), nullable=False)
     scope = Column(String, nullable=False)  # nose, palate, finish
-    term = Column(String, nullable=False)
-    icon_key = Column(String, nullable=True)
+    # 키워드 텍스트와 아이콘은 keyword_terms에 한 번만 저장하고 id로 참조
+    term_id = Column(Integer, ForeignKey("keyword_terms.id"), nullable=False)
     detail_text = Column(Text, nullable=True)
     position = Column(Integer, default=0)
     source_type = Column(String, default="vocabulary")  # vocabulary, user
     
     note = relationship("Note", back_populates="keywords")
+    # 노트 키워드를 읽는 쿼리에 함께 조인 (추가 쿼리 없음)
+    keyword_term = relationship("KeywordTerm", lazy="joined", innerjoin=True)
+    
+    @property
+    def term(self) -> str:
+        return self.keyword_term.term
+    
+    @property
+    def icon_key(self):
+        return self.keyword_term.icon_key
 
 
 class VocabularyTerm(Base):
@@ -67,11 +94,98 @@ class VocabularyTerm(Base):
 
 class UserTerm(Base):
     __tablename__ = "user_terms"
+    __table_args__ = (
+        # scope별로 정규화한 term은 하나만 (upsert 대상)
+        Index("uix_user_terms_scope_normalized", "scope", "normalized_term", unique=True),
+        # 작성 화면 / 페이지 조회: scope별 사용 빈도순
+        Index("ix_user_terms_scope_usage", "scope", desc("usage_count"), "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     scope = Column(String, nullable=False)  # nose, palate, finish
     term = Column(String, nullable=False)
+    normalized_term = Column(String, nullable=False)  # 공백 정리 + 소문자 (중복 판단용)
     icon_key = Column(String, nullable=True)
+    usage_count = Column(Integer, nullable=False, default=0)  # 이 키워드를 쓴 노트 키워드 수
     created_by = Column(String, nullable=True)  # 미래 대비
     created_at = Column(DateTime, default=datetime.utcnow)
 
+
+
+class AppMeta(Base):
+    """애플리케이션 메타데이터 (key-value), 예: 시드 fingerprint"""
+    __tablename__ = "app_meta"
+    
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class FeaturedPick(Base):
+    """날짜별 '오늘의 추천' 노트 (모든 워커가 같은 선택을 공유)"""
+    __tablename__ = "featured_picks"
+
+    pick_date = Column(Date, primary_key=True)
+    position = Column(Integer, primary_key=True)
+    note_id = Column(Integer, ForeignKey("notes.id"), nullable=False)
+
+
+class ProfileStat(Base):
+    """증류소 / 캐스크 종류별 노트 수, 점수 / 도수 합계 (노트 저장 시 증분 갱신)"""
+    __tablename__ = "profile_stats"
+    __table_args__ = (
+        Index("ix_profile_stats_dimension_notes", "dimension", "note_count"),
+    )
+
+    dimension = Column(String, primary_key=True)  # distillery, cask_type
+    value = Column(String, primary_key=True)
+    note_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+    score_count = Column(Integer, nullable=False, default=0)
+    abv_sum = Column(Float, nullable=False, default=0)
+    abv_count = Column(Integer, nullable=False, default=0)
+
+
+class ProfileKeywordStat(Base):
+    """증류소 / 캐스크 종류별 키워드 사용 횟수 (세부 키워드 -> 중분류 -> 대분류로 합산)"""
+    __tablename__ = "profile_keyword_stats"
+    __table_args__ = (
+        # 프로필 조회: (dimension, value)의 scope/level별 상위 키워드
+        Index("ix_profile_keyword_stats_top", "dimension", "value", "scope", "level", desc("count"), "label"),
+    )
+
+    dimension = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    scope = Column(String, primary_key=True)  # nose, palate, finish
+    level = Column(Integer, primary_key=True)  # 1=대분류, 2=중분류, 3=세부키워드
+    label = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class KeywordTerm(Base):
+    """키워드 사전: 기본 어휘, 커스텀 키워드, 노트에 쓰인 키워드의 (scope, term)마다 정수 id 하나"""
+    __tablename__ = "keyword_terms"
+    __table_args__ = (
+        UniqueConstraint("scope", "term", name="uix_keyword_terms_scope_term"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String, nullable=False)
+    term = Column(String, nullable=False)
+    icon_key = Column(String, nullable=True)
+
+
+class KeywordCooccurrence(Base):
+    """같은 노트, 같은 scope에 함께 쓰인 키워드 쌍의 노트 수 (양방향 저장)
+
+    term_id == other_id인 행은 그 키워드가 쓰인 노트 수, (0, 0) 행은 전체 노트 수.
+    """
+    __tablename__ = "keyword_cooccurrence"
+    __table_args__ = (
+        # 함께 쓰인 키워드: term_id로 찾고 count 내림차순
+        Index("ix_keyword_cooccurrence_top", "term_id", desc("count"), "other_id"),
+    )
+
+    term_id = Column(Integer, ForeignKey("keyword_terms.id"), primary_key=True)
+    other_id = Column(Integer, ForeignKey("keyword_terms.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,81 @@
+"""
+SQL statement counter and per-route query budgets
+
+Routes declare how many statements they may issue with @query_budget(n).
+The middleware counts statements per request, reports them in the
+X-Query-Count header and, when QUERY_BUDGET_STRICT=1 (tests), raises
+QueryBudgetExceeded so an N+1 regression fails loudly.
+"""
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from app.db import engine
+
+logger = logging.getLogger(__name__)
+
+STRICT = os.environ.get("QUERY_BUDGET_STRICT", "0") == "1"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements: List[str] = []
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+_current_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed inside the block (they still count toward any enclosing block)"""
+    outer = _current_counter.get()
+    counter = QueryCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+        if outer is not None:
+            outer.count += counter.count
+            outer.statements.extend(counter.statements)
+
+
+def query_budget(limit: int):
+    """Declare the maximum number of SQL statements a route may execute"""
+    def decorator(endpoint):
+        endpoint.__query_budget__ = limit
+        return endpoint
+    return decorator
+
+
+async def query_budget_middleware(request, call_next):
+    with count_queries() as counter:
+        response = await call_next(request)
+
+    response.headers["X-Query-Count"] = str(counter.count)
+    endpoint = request.scope.get("endpoint")
+    limit = getattr(endpoint, "__query_budget__", None)
+    if limit is not None and counter.count > limit:
+        message = (
+            f"{request.method} {request.url.path} executed {counter.count} SQL statements "
+            f"(budget {limit}):\n" + "\n".join(counter.statements)
+        )
+        if STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    return response
@@ -22,12 +22,20 @@ class NoteCreate(BaseModel):
     cask_info: Optional[str] = None
     bottle_remaining: Optional[str] = None
     bottle_opened_at: Optional[date] = None
+    nose_comment: Optional[str] = None
+    palate_comment: Optional[str] = None
+    finish_comment: Optional[str] = None
     overall_comment: Optional[str] = None
     score: Optional[int] = None
     is_draft: bool = False
     keywords: list[KeywordDetail] = []
 
 
+class NoteImport(NoteCreate):
+    # 과거 기록 이전용 (없으면 가져온 시각)
+    created_at: Optional[datetime] = None
+
+
 class NoteUpdate(BaseModel):
     name: Optional[str] = None
     distillery: Optional[str] = None
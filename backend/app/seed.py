@@ -2,12 +2,23 @@
 Seed script for initial vocabulary terms based on Flavor Wheel hierarchy
 Run: python -m backend.app.seed
 """
+import hashlib
 import json
 import os
+import sys
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.db import SessionLocal, init_db
-from app.models import VocabularyTerm
+from app.models import VocabularyTerm, AppMeta
+from app.services.vocabulary_cache import VocabularyCache
+from app.services.suggest_service import KeywordSuggestService
+from app.services.term_dictionary import TermDictionary
 from datetime import datetime
 
+SCOPES = ("nose", "palate", "finish")
+
+# app_meta에 저장되는 시드 입력값 해시
+SEED_FINGERPRINT_KEY = "vocabulary_seed_fingerprint"
+
 
 def load_flavor_categories():
     """Load flavor categories from JSON file"""
@@ -156,166 +167,189 @@ def get_korean_translation():
     }
 
 
-def seed_vocabulary():
-    """Seed vocabulary terms for nose, palate, finish based on Flavor Wheel"""
+def get_icon_mapping():
+    """Get icon emoji for English keywords (categories, subcategories, some details)"""
+    return {
+        # Categories (Level 1)
+        "FRUITY": "🍎",
+        "FLORAL": "🌸",
+        "SWEET": "🍬",
+        "NUTTY": "🥜",
+        "SPICY": "🌶️",
+        "SAVORY": "🔥",
+        # Subcategories (Level 2)
+        "BERRY": "🫐",
+        "DRIED FRUIT": "🍇",
+        "CITRUS": "🍋",
+        "OTHER FRUIT": "🍎",
+        "BLACK TEA": "🍵",
+        "FLORAL (GENERAL)": "🌼",
+        "JASMINE": "🌺",
+        "ROSE": "🌹",
+        "BROWN SUGAR": "🍮",
+        "HONEY": "🍯",
+        "MOLASSES": "🍯",
+        "VANILLA": "🌿",
+        "NUTTY": "🥜",
+        "COCOA": "🍫",
+        "DARK CHOCOLATE": "🍫",
+        "MILK CHOCOLATE": "🍫",
+        "CINNAMON": "🌰",
+        "CLOVE": "🌰",
+        "NUTMEG": "🌰",
+        "HERBAL": "🌿",
+        "SMOKY": "💨",
+        "TOBACCO": "🚬",
+        "ROASTED GRAIN": "🌾",
+        "MALT": "🌾",
+        # Detail keywords (Level 3) - use subcategory icon as default
+        "STRAWBERRY": "🍓",
+        "RASPBERRY": "🍇",
+        "BLUEBERRY": "🫐",
+        "BLACKBERRY": "🫐",
+        "FIG": "🫐",
+        "DATE": "🍇",
+        "PRUNE": "🍇",
+        "RAISIN": "🍇",
+        "LEMON": "🍋",
+        "LIME": "🍋",
+        "ORANGE": "🍊",
+        "GRAPEFRUIT": "🍊",
+        "APPLE": "🍎",
+        "PEAR": "🍏",
+        "GRAPE": "🍇",
+        "MELON": "🍈",
+        "PEATY SMOKE": "💨",
+        "SWEET SMOKE": "💨",
+        "CHARCOAL": "⚫",
+        "CAMPFIRE": "🔥",
+    }
+
+
+def build_vocabulary_rows(flavor_data, korean_translations, icon_mapping):
+    """Expand the flavor wheel into vocabulary_terms rows for every scope"""
+    rows = []
+    for scope in SCOPES:
+        for category, subcategories in flavor_data.items():
+            # Level 1: Category (대분류) - 한국어로 저장
+            cat_term_kr = korean_translations.get(category, category)
+            cat_icon = icon_mapping.get(category, "default")
+            rows.append({
+                "scope": scope,
+                "term": cat_term_kr,
+                "icon_key": cat_icon,
+                "category": cat_term_kr,
+                "subcategory": None,
+                "level": 1,
+            })
+            
+            for subcategory, detail_keywords in subcategories.items():
+                # Level 2: Subcategory (중분류) - 한국어로 저장
+                subcat_term_kr = korean_translations.get(subcategory, subcategory)
+                subcat_icon = icon_mapping.get(subcategory, cat_icon)
+                rows.append({
+                    "scope": scope,
+                    "term": subcat_term_kr,
+                    "icon_key": subcat_icon,
+                    "category": cat_term_kr,
+                    "subcategory": subcat_term_kr,
+                    "level": 2,
+                })
+                
+                # Level 3: Detail keywords (세부 키워드) - 한국어로 저장
+                # Use specific icon if available, otherwise use subcategory icon
+                for detail_kw_en in detail_keywords:
+                    rows.append({
+                        "scope": scope,
+                        "term": korean_translations.get(detail_kw_en, detail_kw_en),
+                        "icon_key": icon_mapping.get(detail_kw_en, subcat_icon),
+                        "category": cat_term_kr,
+                        "subcategory": subcat_term_kr,
+                        "level": 3,
+                    })
+    return rows
+
+
+def vocabulary_fingerprint(flavor_data, korean_translations, icon_mapping):
+    """Hash of every seed input; unchanged inputs mean nothing to seed"""
+    source = json.dumps(
+        [flavor_data, korean_translations, icon_mapping, list(SCOPES)],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def seed_vocabulary(force: bool = False):
+    """Seed vocabulary terms for nose, palate, finish based on Flavor Wheel
+    
+    The seed inputs are fingerprinted and the fingerprint is stored in
+    app_meta. When it matches, seeding costs a single SELECT. Otherwise
+    only new or changed rows are written with one bulk upsert. Existing
+    terms are never deleted.
+    """
     db = SessionLocal()
     
     try:
-        # Clear existing vocabulary terms for fresh start
-        # Comment out if you want to keep existing data
-        # db.query(VocabularyTerm).delete()
-        # db.commit()
-        
-        # Get existing terms to avoid duplicates
-        # (scope, term, level) 조합으로 체크하여 같은 term이 다른 level에 저장 가능하도록
-        existing_terms = {(term.scope, term.term, term.level) for term in db.query(VocabularyTerm).all()}
-        
-        # Load flavor categories and translations
         flavor_data = load_flavor_categories()
         korean_translations = get_korean_translation()
+        icon_mapping = get_icon_mapping()
+        fingerprint = vocabulary_fingerprint(flavor_data, korean_translations, icon_mapping)
+        
+        stored = db.query(AppMeta).filter(AppMeta.key == SEED_FINGERPRINT_KEY).first()
+        if stored and stored.value == fingerprint and not force:
+            return
         
-        # Icon mapping for categories
-        icon_mapping = {
-            # Categories (Level 1)
-            "FRUITY": "🍎",
-            "FLORAL": "🌸",
-            "SWEET": "🍬",
-            "NUTTY": "🥜",
-            "SPICY": "🌶️",
-            "SAVORY": "🔥",
-            # Subcategories (Level 2)
-            "BERRY": "🫐",
-            "DRIED FRUIT": "🍇",
-            "CITRUS": "🍋",
-            "OTHER FRUIT": "🍎",
-            "BLACK TEA": "🍵",
-            "FLORAL (GENERAL)": "🌼",
-            "JASMINE": "🌺",
-            "ROSE": "🌹",
-            "BROWN SUGAR": "🍮",
-            "HONEY": "🍯",
-            "MOLASSES": "🍯",
-            "VANILLA": "🌿",
-            "NUTTY": "🥜",
-            "COCOA": "🍫",
-            "DARK CHOCOLATE": "🍫",
-            "MILK CHOCOLATE": "🍫",
-            "CINNAMON": "🌰",
-            "CLOVE": "🌰",
-            "NUTMEG": "🌰",
-            "HERBAL": "🌿",
-            "SMOKY": "💨",
-            "TOBACCO": "🚬",
-            "ROASTED GRAIN": "🌾",
-            "MALT": "🌾",
-            # Detail keywords (Level 3) - use subcategory icon as default
-            "STRAWBERRY": "🍓",
-            "RASPBERRY": "🍇",
-            "BLUEBERRY": "🫐",
-            "BLACKBERRY": "🫐",
-            "FIG": "🫐",
-            "DATE": "🍇",
-            "PRUNE": "🍇",
-            "RAISIN": "🍇",
-            "LEMON": "🍋",
-            "LIME": "🍋",
-            "ORANGE": "🍊",
-            "GRAPEFRUIT": "🍊",
-            "APPLE": "🍎",
-            "PEAR": "🍏",
-            "GRAPE": "🍇",
-            "MELON": "🍈",
-            "PEATY SMOKE": "💨",
-            "SWEET SMOKE": "💨",
-            "CHARCOAL": "⚫",
-            "CAMPFIRE": "🔥",
+        # (scope, term, level) 조합으로 비교하여 같은 term이 다른 level에 저장 가능하도록
+        existing = {
+            (row.scope, row.term, row.level): (row.icon_key, row.category, row.subcategory)
+            for row in db.query(
+                VocabularyTerm.scope, VocabularyTerm.term, VocabularyTerm.level,
+                VocabularyTerm.icon_key, VocabularyTerm.category, VocabularyTerm.subcategory
+            )
         }
         
-        added_count = {"nose": 0, "palate": 0, "finish": 0}
+        # 새 항목 또는 아이콘/분류가 바뀐 항목만 반영
+        # 번역이 겹치는 키워드(예: 흑설탕)는 처음 나온 것만 사용
+        seen = set()
+        rows = []
+        for row in build_vocabulary_rows(flavor_data, korean_translations, icon_mapping):
+            key = (row["scope"], row["term"], row["level"])
+            if key in seen:
+                continue
+            seen.add(key)
+            if existing.get(key) != (row["icon_key"], row["category"], row["subcategory"]):
+                rows.append(row)
         
-        # Process each scope (nose, palate, finish)
-        for scope in ["nose", "palate", "finish"]:
-            # Add all flavor categories for all scopes
-            for category, subcategories in flavor_data.items():
-                # Level 1: Category (대분류) - 한국어로 저장
-                cat_term_en = category
-                cat_term_kr = korean_translations.get(cat_term_en, cat_term_en)
-                
-                if (scope, cat_term_kr, 1) not in existing_terms:
-                    try:
-                        vocab = VocabularyTerm(
-                            scope=scope,
-                            term=cat_term_kr,
-                            icon_key=icon_mapping.get(cat_term_en, "default"),
-                            category=cat_term_kr,
-                            subcategory=None,
-                            level=1
-                        )
-                        db.add(vocab)
-                        db.flush()
-                        existing_terms.add((scope, cat_term_kr, 1))
-                        added_count[scope] += 1
-                    except Exception as e:
-                        db.rollback()
-                        print(f"Warning: Failed to add {scope} category '{cat_term_kr}': {e}")
-                        continue
-                
-                # Level 2 & 3: Subcategories and detail keywords
-                for subcategory, detail_keywords in subcategories.items():
-                    # Level 2: Subcategory (중분류) - 한국어로 저장
-                    subcat_term_en = subcategory
-                    subcat_term_kr = korean_translations.get(subcat_term_en, subcat_term_en)
-                    
-                    if (scope, subcat_term_kr, 2) not in existing_terms:
-                        try:
-                            vocab = VocabularyTerm(
-                                scope=scope,
-                                term=subcat_term_kr,
-                                icon_key=icon_mapping.get(subcat_term_en, icon_mapping.get(cat_term_en, "default")),
-                                category=cat_term_kr,
-                                subcategory=subcat_term_kr,
-                                level=2
-                            )
-                            db.add(vocab)
-                            db.flush()
-                            existing_terms.add((scope, subcat_term_kr, 2))
-                            added_count[scope] += 1
-                        except Exception as e:
-                            db.rollback()
-                            print(f"Warning: Failed to add {scope} subcategory '{subcat_term_kr}': {e}")
-                            continue
-                    
-                    # Level 3: Detail keywords (세부 키워드) - 한국어로 저장
-                    for detail_kw_en in detail_keywords:
-                        detail_kw_kr = korean_translations.get(detail_kw_en, detail_kw_en)
-                        
-                        if (scope, detail_kw_kr, 3) not in existing_terms:
-                            try:
-                                # Use specific icon if available, otherwise use subcategory icon
-                                icon_key = icon_mapping.get(
-                                    detail_kw_en, 
-                                    icon_mapping.get(subcat_term_en, icon_mapping.get(cat_term_en, "default"))
-                                )
-                                vocab = VocabularyTerm(
-                                    scope=scope,
-                                    term=detail_kw_kr,
-                                    icon_key=icon_key,
-                                    category=cat_term_kr,
-                                    subcategory=subcat_term_kr,
-                                    level=3
-                                )
-                                db.add(vocab)
-                                db.flush()
-                                existing_terms.add((scope, detail_kw_kr, 3))
-                                added_count[scope] += 1
-                            except Exception as e:
-                                db.rollback()
-                                print(f"Warning: Failed to add {scope} detail keyword '{detail_kw_kr}': {e}")
-                                continue
+        added_count = {scope: 0 for scope in SCOPES}
+        if rows:
+            now = datetime.utcnow()
+            for row in rows:
+                row["created_at"] = now
+                if (row["scope"], row["term"], row["level"]) not in existing:
+                    added_count[row["scope"]] += 1
+            stmt = sqlite_insert(VocabularyTerm.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["scope", "term", "level"],
+                set_={
+                    "icon_key": stmt.excluded.icon_key,
+                    "category": stmt.excluded.category,
+                    "subcategory": stmt.excluded.subcategory,
+                },
+            )
+            db.execute(stmt, rows)
+            TermDictionary.intern(db, [(row["scope"], row["term"], row["icon_key"]) for row in rows])
+        
+        if stored:
+            stored.value = fingerprint
+        else:
+            db.add(AppMeta(key=SEED_FINGERPRINT_KEY, value=fingerprint))
         
         db.commit()
+        VocabularyCache.invalidate()
+        KeywordSuggestService.invalidate()
         print(f"Seeded vocabulary terms: {added_count['nose']} nose, {added_count['palate']} palate, {added_count['finish']} finish")
-        print(f"Total: {sum(added_count.values())} terms added")
+        print(f"Total: {sum(added_count.values())} terms added, {len(rows) - sum(added_count.values())} updated")
         
     except Exception as e:
         db.rollback()
@@ -329,6 +363,7 @@ if __name__ == "__main__":
     print("Initializing database...")
     init_db()
     print("Seeding vocabulary terms...")
-    seed_vocabulary()
+    # --force: fingerprint가 같아도 기존 행과 비교하여 다시 반영
+    seed_vocabulary(force="--force" in sys.argv)
     print("Done!")
 
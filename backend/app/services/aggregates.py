@@ -0,0 +1,54 @@
+"""
+Helpers for counter tables maintained by delta (profile stats, co-occurrence)
+
+Writers accumulate signed deltas per key and hand them over in one batch;
+rows are upserted with "count = count + delta" and pruned once they reach
+zero, so an aggregate never needs a full recount after a note write.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import Table, and_, bindparam, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models import AppMeta
+
+
+def upsert_deltas(db: Session, table: Table, keys: Sequence[str], rows: List[Dict[str, Any]]):
+    """Add each row's non-key values to the stored row (insert when missing)"""
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={
+            column.name: column + getattr(stmt.excluded, column.name)
+            for column in table.columns
+            if column.name not in keys
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def prune_zero(db: Session, table: Table, count_column: str, rows: List[Dict[str, Any]]):
+    """Delete rows whose count dropped to zero (only keys that just decreased)"""
+    keys = [column.name for column in table.primary_key.columns]
+    decreased = [{f"key_{k}": row[k] for k in keys} for row in rows if row[count_column] < 0]
+    if decreased:
+        db.execute(
+            delete(table).where(and_(
+                *[table.c[k] == bindparam(f"key_{k}") for k in keys],
+                table.c[count_column] <= 0,
+            )).execution_options(synchronize_session=False),
+            decreased,
+        )
+
+
+def built_version(db: Session, key: str) -> Optional[str]:
+    meta = db.get(AppMeta, key)
+    return meta.value if meta is not None else None
+
+
+def mark_built(db: Session, key: str, version: str):
+    """Record which version of an aggregate the database holds (caller commits)"""
+    meta = db.get(AppMeta, key)
+    if meta is None:
+        db.add(AppMeta(key=key, value=version))
+    else:
+        meta.value = version
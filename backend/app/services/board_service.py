@@ -0,0 +1,179 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Any, NamedTuple
+from sqlalchemy import or_, tuple_
+from sqlalchemy.orm import Session
+from app.models import Note
+from app.services.flavor_hierarchy import FlavorHierarchy
+from app.services.search_service import SearchService
+
+
+PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+SORT_FIELDS = ("relevance", "created_at", "name")
+
+
+class BoardPage(NamedTuple):
+    notes: List[Note]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+    sort_by: str
+
+
+def _encode_cursor(direction: str, sort_key: str, value: Any, note_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"d": direction, "s": sort_key, "v": value, "id": note_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_key: str):
+    """Return (direction, value, id); raises ValueError for malformed or foreign cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction, value, note_id = payload["d"], payload["v"], int(payload["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if direction not in ("next", "prev") or payload.get("s") != sort_key:
+        raise ValueError("Cursor does not match the current sort")
+    if sort_key.startswith("created_at"):
+        value = datetime.fromisoformat(value)
+    return direction, value, note_id
+
+
+class BoardService:
+    """게시판 목록 조회 (검색 + 정렬 + 키셋 페이지네이션)"""
+
+    @staticmethod
+    def resolve_sort(sort_by: Optional[str], search: Optional[str]) -> str:
+        """Pick the effective sort field (relevance only applies while searching)"""
+        if sort_by not in SORT_FIELDS:
+            sort_by = None
+        if not sort_by:
+            return "relevance" if search else "created_at"
+        if sort_by == "relevance" and not search:
+            return "created_at"
+        return sort_by
+
+    @staticmethod
+    def build_query(
+        db: Session,
+        sort_by: Optional[str] = None,
+        sort_order: str = "desc",
+        search: Optional[str] = None,
+        search_mode: str = "AND",
+        include_drafts: bool = False,
+    ):
+        """Filtered board query plus its (sort column, id) key and direction
+
+        Returns (query, sort_column, descending, sort_by). The query is not
+        ordered yet; callers order by (sort_column, Note.id). The board shows
+        published notes only; exports pass include_drafts=True.
+        """
+        sort_by = BoardService.resolve_sort(sort_by, search)
+        query = db.query(Note)
+        if not include_drafts:
+            query = query.filter(Note.is_draft == False)
+
+        # Search (FTS5 인덱스 사용)
+        search_hits = None
+        if search:
+            search_terms = [s.strip() for s in search.split() if s.strip()]
+            # 대분류 / 중분류 이름은 하위 키워드가 달린 노트까지 포함
+            expansions = {}
+            for term in search_terms:
+                expansion = FlavorHierarchy.expand(db, term)
+                if expansion:
+                    expansions[term] = expansion
+            
+            if expansions and search_mode == "OR":
+                conditions = [Note.id.in_(FlavorHierarchy.note_ids(e)) for e in expansions.values()]
+                match = SearchService.build_match(search_terms, search_mode)
+                if match:
+                    conditions.append(Note.id.in_(SearchService.match_ids(match)))
+                query = query.filter(or_(*conditions))
+            else:
+                for term, expansion in expansions.items():
+                    conditions = [Note.id.in_(FlavorHierarchy.note_ids(expansion))]
+                    match = SearchService.build_match([term])
+                    if match:
+                        conditions.append(Note.id.in_(SearchService.match_ids(match)))
+                    query = query.filter(or_(*conditions))
+                match = SearchService.build_match([t for t in search_terms if t not in expansions], search_mode)
+                if match:
+                    search_hits = SearchService.match_subquery(match)
+                    query = query.join(search_hits, search_hits.c.note_id == Note.id)
+
+        if sort_by == "relevance" and search_hits is None:
+            sort_by = "created_at"
+
+        if sort_by == "relevance":
+            # bm25는 낮을수록 관련도가 높음
+            return query, search_hits.c.rank, False, sort_by
+        if sort_by == "name":
+            return query, Note.name, sort_order != "asc", sort_by
+        return query, Note.created_at, sort_order != "asc", sort_by
+
+    @staticmethod
+    def ordered(query, sort_column, descending: bool):
+        if descending:
+            return query.order_by(sort_column.desc(), Note.id.desc())
+        return query.order_by(sort_column.asc(), Note.id.asc())
+
+    @staticmethod
+    def get_page(
+        db: Session,
+        sort_by: Optional[str] = None,
+        sort_order: str = "desc",
+        search: Optional[str] = None,
+        search_mode: str = "AND",
+        cursor: Optional[str] = None,
+        limit: int = PAGE_SIZE,
+    ) -> BoardPage:
+        """One page of board notes, seeking from the cursor instead of using OFFSET"""
+        limit = max(1, min(limit or PAGE_SIZE, MAX_PAGE_SIZE))
+        query, sort_column, descending, sort_by = BoardService.build_query(
+            db, sort_by, sort_order, search, search_mode
+        )
+        sort_key = f"{sort_by}:{'desc' if descending else 'asc'}"
+        is_relevance = sort_by == "relevance"
+        if is_relevance:
+            query = query.add_columns(sort_column)
+
+        direction = "next"
+        if cursor:
+            direction, value, note_id = _decode_cursor(cursor, sort_key)
+            key = tuple_(sort_column, Note.id)
+            # "prev"는 역방향으로 조회한 뒤 뒤집는다
+            if (direction == "next") == descending:
+                query = query.filter(key < tuple_(value, note_id))
+            else:
+                query = query.filter(key > tuple_(value, note_id))
+
+        scan_descending = descending if direction == "next" else not descending
+        rows = BoardService.ordered(query, sort_column, scan_descending).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if direction == "prev":
+            rows.reverse()
+
+        if is_relevance:
+            notes = [row[0] for row in rows]
+            keys = [row[1] for row in rows]
+        else:
+            notes = rows
+            keys = [getattr(n, sort_by) for n in notes]
+
+        has_next = has_more if direction == "next" else cursor is not None
+        has_prev = has_more if direction == "prev" else cursor is not None
+
+        next_cursor = prev_cursor = None
+        if notes and has_next:
+            next_cursor = _encode_cursor("next", sort_key, keys[-1], notes[-1].id)
+        if notes and has_prev:
+            prev_cursor = _encode_cursor("prev", sort_key, keys[0], notes[0].id)
+
+        return BoardPage(notes, next_cursor, prev_cursor, sort_by)
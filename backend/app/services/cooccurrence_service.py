@@ -0,0 +1,219 @@
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, delete, select
+from sqlalchemy.orm import Session, aliased
+from app.models import KeywordCooccurrence, KeywordTerm
+from app.services.aggregates import built_version, mark_built, prune_zero, upsert_deltas
+from app.services.term_dictionary import TermDictionary
+
+try:
+    import numpy as np
+except ImportError:  # NumPy가 없으면 전체 재계산을 Counter로 처리
+    np = None
+
+
+DEFAULT_RELATED = 10
+MAX_RELATED = 50
+
+COOCCURRENCE_KEY = "cooccurrence_version"
+COOCCURRENCE_VERSION = "2"  # 2: (0, 0) 행에 전체 노트 수
+
+# keyword_terms id는 1부터 시작하므로 (0, 0) 행에 전체 노트 수를 함께 저장
+NOTE_TOTAL_ID = 0
+
+_INSERT_CHUNK = 50000
+
+# (scope, term)
+KeywordPair = Tuple[str, str]
+
+
+def _pairs(term_ids: Iterable[int]) -> List[Tuple[int, int]]:
+    """Ordered pairs of one note's terms in one scope, including (t, t)"""
+    ids = sorted(set(term_ids))
+    return [(a, b) for a in ids for b in ids]
+
+
+def _count_pairs_numpy(groups: "np.ndarray", terms: "np.ndarray", n_terms: int):
+    """(term_id, other_id, count) arrays for terms sharing a group (note, scope)"""
+    order = np.lexsort((terms, groups))
+    groups, terms = groups[order], terms[order]
+    # 같은 노트에 같은 키워드가 여러 번 있어도 한 번만 셈
+    keep = np.ones(len(terms), dtype=bool)
+    keep[1:] = (groups[1:] != groups[:-1]) | (terms[1:] != terms[:-1])
+    groups, terms = groups[keep], terms[keep]
+
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(groups)])
+    # 각 키워드를 그룹 크기만큼 반복해서 그룹 안의 모든 키워드와 짝지음
+    per_item = np.repeat(sizes, sizes)
+    item_start = np.repeat(starts, sizes)
+    left = np.repeat(terms, per_item)
+    first = np.repeat(item_start, per_item)
+    offsets = np.arange(len(left), dtype=np.int64) - np.repeat(np.cumsum(per_item) - per_item, per_item)
+    right = terms[first + offsets]
+
+    codes, counts = np.unique(left.astype(np.int64) * n_terms + right, return_counts=True)
+    return codes // n_terms, codes % n_terms, counts
+
+
+class CooccurrenceService:
+    """같은 노트의 같은 scope에 함께 쓰인 키워드 집계 (term id 쌍, 증분 갱신)
+
+    keyword_cooccurrence stores each pair in both directions so partners
+    of a term are one range read on ix_keyword_cooccurrence_top; the
+    (t, t) row is the number of notes using t and the (0, 0) row the number
+    of notes, so lift needs no scan of notes. Drafts are counted, the same
+    as keyword suggestions.
+    """
+
+    @staticmethod
+    def apply(
+        db: Session,
+        removed: Iterable[Iterable[KeywordPair]] = (),
+        added: Iterable[Iterable[KeywordPair]] = (),
+        icons: Optional[Dict[KeywordPair, Optional[str]]] = None,
+    ):
+        """Subtract removed and add added notes' keyword sets (does not commit)
+
+        Every element is one note, also when it has no keywords, so the
+        note total follows creates and deletes.
+        """
+        changes = [(-1, set(pairs)) for pairs in removed] + [(1, set(pairs)) for pairs in added]
+        deltas: Counter = Counter()
+        for sign, _ in changes:
+            deltas[(NOTE_TOTAL_ID, NOTE_TOTAL_ID)] += sign
+        changes = [(sign, pairs) for sign, pairs in changes if pairs]
+        icons = icons or {}
+        ids = TermDictionary.intern(db, [
+            (scope, term, icons.get((scope, term))) for _, pairs in changes for scope, term in pairs
+        ])
+
+        for sign, pairs in changes:
+            by_scope: Dict[str, List[int]] = {}
+            for scope, term in pairs:
+                by_scope.setdefault(scope, []).append(ids[(scope, term)])
+            for term_ids in by_scope.values():
+                for pair in _pairs(term_ids):
+                    deltas[pair] += sign
+
+        rows = [{"term_id": a, "other_id": b, "count": count} for (a, b), count in deltas.items() if count]
+        if rows:
+            table = KeywordCooccurrence.__table__
+            upsert_deltas(db, table, ("term_id", "other_id"), rows)
+            prune_zero(db, table, "count", rows)
+
+    @classmethod
+    def rebuild(cls, db: Session):
+        """Recount every pair from note_keywords.term_id (vectorized when NumPy is available)"""
+        conn = db.connection()
+        rows = conn.exec_driver_sql(
+            "SELECT note_id, term_id FROM note_keywords"
+        ).fetchall()
+        # term id마다 scope가 정해져 있으므로 그룹 (노트, scope)도 정수로 계산
+        term_scopes = conn.exec_driver_sql("SELECT id, scope FROM keyword_terms").fetchall()
+        scope_codes = {scope: code for code, scope in enumerate(sorted({scope for _, scope in term_scopes}))}
+        n_scopes = max(len(scope_codes), 1)
+
+        table = KeywordCooccurrence.__table__
+        db.execute(delete(table))
+        note_total = conn.exec_driver_sql("SELECT COUNT(*) FROM notes").scalar()
+        if note_total:
+            conn.exec_driver_sql(
+                "INSERT INTO keyword_cooccurrence (term_id, other_id, count) VALUES (?, ?, ?)",
+                (NOTE_TOTAL_ID, NOTE_TOTAL_ID, note_total),
+            )
+        if rows:
+            if np is not None:
+                n_terms = max(term_id for term_id, _ in term_scopes) + 1
+                scope_of = np.zeros(n_terms, dtype=np.int64)
+                scope_of[[term_id for term_id, _ in term_scopes]] = [scope_codes[scope] for _, scope in term_scopes]
+                keywords = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows)).reshape(-1, 2)
+                terms = keywords[:, 1]
+                a, b, counts = _count_pairs_numpy(keywords[:, 0] * n_scopes + scope_of[terms], terms, n_terms)
+                pairs = zip(a.tolist(), b.tolist(), counts.tolist())
+            else:
+                scope_of = {term_id: scope_codes[scope] for term_id, scope in term_scopes}
+                grouped: Dict[int, List[int]] = {}
+                for note_id, term_id in rows:
+                    grouped.setdefault(note_id * n_scopes + scope_of[term_id], []).append(term_id)
+                counter: Counter = Counter()
+                for term_ids in grouped.values():
+                    counter.update(_pairs(term_ids))
+                pairs = ((a, b, count) for (a, b), count in counter.items())
+
+            # ORM을 거치지 않고 드라이버로 바로 삽입 (수백만 행)
+            batch: List[Tuple[int, int, int]] = []
+            for pair in pairs:
+                batch.append(pair)
+                if len(batch) >= _INSERT_CHUNK:
+                    conn.exec_driver_sql(
+                        "INSERT INTO keyword_cooccurrence (term_id, other_id, count) VALUES (?, ?, ?)", batch
+                    )
+                    batch = []
+            if batch:
+                conn.exec_driver_sql(
+                    "INSERT INTO keyword_cooccurrence (term_id, other_id, count) VALUES (?, ?, ?)", batch
+                )
+
+        mark_built(db, COOCCURRENCE_KEY, COOCCURRENCE_VERSION)
+        db.commit()
+
+    @classmethod
+    def init_counts(cls, bind):
+        """Build the pair counts once for databases created before they existed"""
+        with Session(bind=bind) as db:
+            if built_version(db, COOCCURRENCE_KEY) != COOCCURRENCE_VERSION:
+                cls.rebuild(db)
+
+    @staticmethod
+    def related(db: Session, scope: str, term: str, limit: int = DEFAULT_RELATED) -> List[Dict[str, Any]]:
+        """Terms used most often together with (scope, term), with their lift
+
+        lift = P(a, b) / (P(a) P(b)) over all notes; above 1 means the pair
+        shows up together more than chance would explain.
+        """
+        term_id = TermDictionary.lookup(db, scope, term)
+        if term_id is None:
+            return []
+
+        rows = db.execute(CooccurrenceService.related_query(term_id, limit)).all()
+
+        related = []
+        for other, icon_key, count, partner_count, own_count, total in rows:
+            lift = count * total / (own_count * partner_count) if own_count and partner_count and total else None
+            related.append({
+                "term": other,
+                "icon_key": icon_key,
+                "count": count,
+                "lift": round(lift, 2) if lift is not None else None,
+            })
+        return related
+
+    @staticmethod
+    def related_query(term_id: int, limit: int = DEFAULT_RELATED):
+        """Partners of term_id in count order (ix_keyword_cooccurrence_top) with note counts
+
+        own_count and total are primary-key lookups of the (t, t) and (0, 0) rows.
+        """
+        pair = KeywordCooccurrence.__table__
+        own = aliased(KeywordCooccurrence)
+        partner = aliased(KeywordCooccurrence)
+        notes = aliased(KeywordCooccurrence)
+        own_count = select(own.count).where(own.term_id == term_id, own.other_id == term_id).scalar_subquery()
+        total = select(notes.count).where(
+            notes.term_id == NOTE_TOTAL_ID, notes.other_id == NOTE_TOTAL_ID
+        ).scalar_subquery()
+        return (
+            select(
+                KeywordTerm.term, KeywordTerm.icon_key, pair.c.count,
+                partner.count.label("partner_count"),
+                own_count.label("own_count"),
+                total.label("total"),
+            )
+            .join(KeywordTerm, KeywordTerm.id == pair.c.other_id)
+            .join(partner, and_(partner.term_id == pair.c.other_id, partner.other_id == pair.c.other_id))
+            .where(pair.c.term_id == term_id, pair.c.other_id != term_id)
+            .order_by(pair.c.count.desc(), pair.c.other_id)
+            .limit(limit)
+        )
@@ -0,0 +1,303 @@
+import csv
+import io
+import json
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+from sqlalchemy.orm import Session
+from app.models import KeywordTerm, Note, NoteKeyword
+from app.services.board_service import BoardService
+from app.services.note_service import NoteService
+
+
+EXPORT_FORMATS = ("jsonl", "csv", "zip")
+EXPORT_BATCH_SIZE = 200
+# 첫 바이트를 빨리 보내기 위해 첫 배치는 작게
+FIRST_BATCH_SIZE = 20
+
+EXPORT_MEDIA_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "zip": "application/zip",
+}
+
+# NoteImport와 같은 필드 구성 (Export 결과를 그대로 다시 가져올 수 있음)
+EXPORT_FIELDS = (
+    "id", "name", "distillery", "age", "cask_type", "abv", "is_single_cask", "cask_info",
+    "bottle_remaining", "bottle_opened_at", "nose_comment", "palate_comment", "finish_comment",
+    "overall_comment", "score", "is_draft", "image_path", "created_at", "updated_at",
+)
+KEYWORD_FIELDS = ("scope", "term", "icon_key", "detail_text", "position", "source_type")
+
+_SCOPE_SECTIONS = (
+    ("nose", "Nose (향)", "nose_comment"),
+    ("palate", "Palate (맛)", "palate_comment"),
+    ("finish", "Finish (여운)", "finish_comment"),
+)
+
+_UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|\s]+')
+
+# 단일 노트 .txt 렌더링 결과 캐시 (노트 수정 시 updated_at이 바뀌므로 키가 달라짐)
+EXPORT_CACHE_SIZE = int(os.environ.get("EXPORT_CACHE_SIZE", "256"))
+
+# 예전 export_note가 uploads에 남긴 파일 (note_{id}_{YYYYmmdd_HHMMSS}.txt)
+_LEGACY_EXPORT_RE = re.compile(r"^note_\d+_\d{8}_\d{6}\.txt$")
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _record(note: Note, keywords: List[Any]) -> Dict[str, Any]:
+    record = {field: _json_value(getattr(note, field)) for field in EXPORT_FIELDS}
+    record["keywords"] = [{field: getattr(kw, field) for field in KEYWORD_FIELDS} for kw in keywords]
+    return record
+
+
+class RenderedNote(NamedTuple):
+    content: bytes
+    filename: str
+
+
+class _ZipChunks(io.RawIOBase):
+    """Write-only, unseekable sink so ZipFile streams entries as they are added"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer.extend(data)
+        return len(data)
+
+    def take(self) -> bytes:
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        return chunk
+
+
+class ExportService:
+    """노트 Export (단일 노트 텍스트 / 전체 컬렉션 스트리밍)"""
+
+    _cache: "OrderedDict[Tuple[int, datetime], RenderedNote]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    @staticmethod
+    def render_text(note: Note, keywords_by_scope: Dict[str, List[Any]]) -> str:
+        """Plain-text tasting note, as downloaded from the detail page"""
+        lines = []
+        lines.append("=" * 50)
+        lines.append(f"위스키 테이스팅 노트")
+        lines.append("=" * 50)
+        lines.append("")
+        lines.append(f"이름: {note.name}")
+        if note.distillery:
+            lines.append(f"증류소: {note.distillery}")
+        if note.age:
+            lines.append(f"숙성년도: {note.age}년")
+        if note.cask_type:
+            lines.append(f"캐스크 종류: {note.cask_type}")
+        if note.abv:
+            lines.append(f"도수: {note.abv}%")
+        if note.is_single_cask and note.cask_info:
+            lines.append(f"싱글 캐스크: {note.cask_info}")
+        if note.bottle_remaining:
+            lines.append(f"잔여량: {note.bottle_remaining}")
+        if note.bottle_opened_at:
+            lines.append(f"개봉일: {note.bottle_opened_at}")
+        for scope, title, comment_field in _SCOPE_SECTIONS:
+            scope_keywords = keywords_by_scope.get(scope) or []
+            comment = getattr(note, comment_field)
+            lines.append("")
+            lines.append("-" * 50)
+            lines.append(title)
+            lines.append("-" * 50)
+            if scope_keywords:
+                lines.append("키워드:")
+                for kw in scope_keywords:
+                    lines.append(f"• {kw.term}")
+            if comment:
+                lines.append("")
+                lines.append("한 줄 총평:")
+                lines.append(comment)
+            if not scope_keywords and not comment:
+                lines.append("(내용 없음)")
+        lines.append("")
+        lines.append("-" * 50)
+        lines.append("총평")
+        lines.append("-" * 50)
+        if note.overall_comment:
+            lines.append(note.overall_comment)
+        if note.score is not None:
+            lines.append(f"점수: {note.score}/100")
+        lines.append("")
+        lines.append(f"작성일: {note.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append("=" * 50)
+        return "\n".join(lines)
+
+    @staticmethod
+    def text_filename(note: Note) -> str:
+        return f"{note.name.replace(' ', '_')}_tasting_note.txt"
+
+    @staticmethod
+    def content_disposition(filename: str) -> str:
+        """attachment header value (RFC 5987 form for non-ASCII names, like FileResponse)"""
+        quoted = quote(filename)
+        if quoted != filename:
+            return f"attachment; filename*=utf-8''{quoted}"
+        return f'attachment; filename="{filename}"'
+
+    @classmethod
+    def note_text(cls, note: Note) -> RenderedNote:
+        """Rendered .txt for a note, cached by (id, updated_at)
+
+        Keywords are only loaded (lazily, one query) on a cache miss.
+        """
+        key = (note.id, note.updated_at)
+        with cls._cache_lock:
+            rendered = cls._cache.get(key)
+            if rendered is not None:
+                cls._cache.move_to_end(key)
+                return rendered
+
+        rendered = RenderedNote(
+            content=cls.render_text(note, NoteService.keywords_by_scope(note)).encode("utf-8"),
+            filename=cls.text_filename(note),
+        )
+        if note.updated_at is not None:
+            with cls._cache_lock:
+                cls._cache[key] = rendered
+                cls._cache.move_to_end(key)
+                while len(cls._cache) > EXPORT_CACHE_SIZE:
+                    cls._cache.popitem(last=False)
+        return rendered
+
+    @staticmethod
+    def cleanup_legacy_files(directory: str) -> int:
+        """Delete .txt exports that older versions wrote into the uploads directory"""
+        removed = 0
+        if not os.path.isdir(directory):
+            return removed
+        for entry in os.scandir(directory):
+            if entry.is_file() and _LEGACY_EXPORT_RE.match(entry.name):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    @staticmethod
+    def iter_batches(
+        db: Session,
+        sort_by: Optional[str] = None,
+        sort_order: str = "desc",
+        search: Optional[str] = None,
+        search_mode: str = "AND",
+        include_drafts: bool = True,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> Iterator[List[Any]]:
+        """Yield [(note, keywords)] batches in board order, drafts included by default
+
+        Notes are read through one server-side cursor (yield_per) and keywords
+        with one IN query per batch, so memory is bounded by the batch size.
+        A zip export additionally keeps one central-directory entry per note.
+        """
+        query, sort_column, descending, _ = BoardService.build_query(
+            db, sort_by, sort_order, search, search_mode, include_drafts=include_drafts
+        )
+        notes = BoardService.ordered(query, sort_column, descending).yield_per(batch_size)
+
+        batch: List[Note] = []
+        limit = min(FIRST_BATCH_SIZE, batch_size)
+        for note in notes:
+            batch.append(note)
+            if len(batch) >= limit:
+                yield ExportService._with_keywords(db, batch)
+                batch = []
+                limit = batch_size
+        if batch:
+            yield ExportService._with_keywords(db, batch)
+
+    @staticmethod
+    def _with_keywords(db: Session, notes: List[Note]) -> List[Any]:
+        grouped: Dict[int, List[Any]] = {note.id: [] for note in notes}
+        columns = {
+            "scope": NoteKeyword.scope,
+            "term": KeywordTerm.term,
+            "icon_key": KeywordTerm.icon_key,
+            "detail_text": NoteKeyword.detail_text,
+            "position": NoteKeyword.position,
+            "source_type": NoteKeyword.source_type,
+        }
+        rows = db.query(
+            NoteKeyword.note_id, *[columns[field].label(field) for field in KEYWORD_FIELDS]
+        ).join(KeywordTerm, KeywordTerm.id == NoteKeyword.term_id).filter(
+            NoteKeyword.note_id.in_(list(grouped))
+        ).order_by(
+            NoteKeyword.note_id, NoteKeyword.position
+        ).all()
+        for row in rows:
+            grouped[row.note_id].append(row)
+        return [(note, grouped[note.id]) for note in notes]
+
+    @staticmethod
+    def stream(db: Session, fmt: str, **filters) -> Iterator[bytes]:
+        """Encode the filtered collection as JSONL, CSV or a zip of text files, batch by batch"""
+        batches = ExportService.iter_batches(db, **filters)
+        if fmt == "csv":
+            return ExportService._stream_csv(batches)
+        if fmt == "zip":
+            return ExportService._stream_zip(batches)
+        return ExportService._stream_jsonl(batches)
+
+    @staticmethod
+    def _stream_jsonl(batches) -> Iterator[bytes]:
+        for batch in batches:
+            yield "".join(
+                json.dumps(_record(note, keywords), ensure_ascii=False) + "\n"
+                for note, keywords in batch
+            ).encode("utf-8")
+
+    @staticmethod
+    def _stream_csv(batches) -> Iterator[bytes]:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(EXPORT_FIELDS + ("keywords",))
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함 (import는 utf-8-sig로 읽음)
+        yield ("\ufeff" + out.getvalue()).encode("utf-8")
+        for batch in batches:
+            out.seek(0)
+            out.truncate()
+            for note, keywords in batch:
+                record = _record(note, keywords)
+                record["keywords"] = json.dumps(record["keywords"], ensure_ascii=False)
+                writer.writerow([record[field] for field in EXPORT_FIELDS + ("keywords",)])
+            yield out.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _stream_zip(batches) -> Iterator[bytes]:
+        sink = _ZipChunks()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for batch in batches:
+                for note, keywords in batch:
+                    grouped: Dict[str, List[Any]] = {}
+                    for kw in keywords:
+                        grouped.setdefault(kw.scope, []).append(kw)
+                    name = _UNSAFE_FILENAME_RE.sub("_", note.name).strip("_") or "note"
+                    archive.writestr(
+                        f"{note.id:05d}_{name}.txt",
+                        ExportService.render_text(note, grouped),
+                    )
+                yield sink.take()
+        # 중앙 디렉터리 (ZipFile 종료 시 기록)
+        yield sink.take()
@@ -1,31 +1,83 @@
+import random
 from datetime import date
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from app.models import Note
+from typing import List, Optional
+from sqlalchemy import Select, delete, func, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Query, Session
+from app.models import FeaturedPick, Note
+
+
+FEATURED_COUNT = 5
 
 
 class FeaturedService:
-    """하루 동안 고정되는 랜덤 추천 노트 관리"""
-    
-    _cache: Dict[str, List[int]] = {}
-    
+    """하루 동안 고정되는 랜덤 추천 노트 관리
+
+    The day's picks live in the featured_picks table, so every worker shows
+    the same notes. They are sampled as random offsets over the
+    (is_draft, created_at, id) index with a date seed, without loading rows.
+    """
+
+    # 이 프로세스에서 오늘의 추천이 저장된 것을 확인한 날짜
+    _ensured: Optional[date] = None
+
+    @staticmethod
+    def ordered_ids(db: Session) -> Query:
+        """Published note ids in a stable order served by ix_notes_draft_created_id"""
+        return db.query(Note.id).filter(Note.is_draft == False).order_by(Note.created_at, Note.id)
+
+    @staticmethod
+    def ids_at_offsets(db: Session, offsets: List[int]) -> Select:
+        """(position, note id) at each offset of ordered_ids, in one UNION ALL statement"""
+        ordered = FeaturedService.ordered_ids(db)
+        picked = [ordered.offset(offset).limit(1).subquery() for offset in offsets]
+        return union_all(*[
+            select(literal(position).label("position"), subquery.c.id)
+            for position, subquery in enumerate(picked)
+        ])
+
+    @staticmethod
+    def picks_query(db: Session, day: date) -> Query:
+        return db.query(Note).join(FeaturedPick, FeaturedPick.note_id == Note.id).filter(
+            FeaturedPick.pick_date == day,
+            Note.is_draft == False,
+        ).order_by(FeaturedPick.position)
+
+    @staticmethod
+    def sample_note_ids(db: Session, day: date, count: int = FEATURED_COUNT) -> List[int]:
+        """count published note ids chosen by a generator seeded with the date"""
+        total = db.query(func.count(Note.id)).filter(Note.is_draft == False).scalar() or 0
+        rng = random.Random(day.toordinal())
+        offsets = rng.sample(range(total), min(count, total))
+        if not offsets:
+            return []
+        rows = db.execute(FeaturedService.ids_at_offsets(db, offsets)).all()
+        return [note_id for _, note_id in sorted(rows)]
+
     @classmethod
-    def get_featured_notes(cls, db: Session, count: int = 5) -> List[Note]:
-        """Get featured notes for today (cached for the day)"""
-        today = date.today().isoformat()
-        
-        if today not in cls._cache:
-            # Get all non-draft notes
-            all_notes = db.query(Note).filter(Note.is_draft == False).all()
-            
-            if len(all_notes) <= count:
-                note_ids = [n.id for n in all_notes]
-            else:
-                import random
-                note_ids = [n.id for n in random.sample(all_notes, count)]
-            
-            cls._cache[today] = note_ids
-        
-        note_ids = cls._cache[today]
-        return db.query(Note).filter(Note.id.in_(note_ids)).all() if note_ids else []
+    def ensure_picks(cls, db: Session, day: Optional[date] = None, count: int = FEATURED_COUNT) -> date:
+        """Select and store the day's picks unless some worker already has; returns the day"""
+        day = day or date.today()
+        if cls._ensured == day:
+            return day
+        stored = db.query(FeaturedPick.position).filter(FeaturedPick.pick_date == day).first()
+        if stored is None:
+            note_ids = cls.sample_note_ids(db, day, count)
+            if not note_ids:
+                return day  # 노트가 없으면 다음 요청에서 다시 확인
+            table = FeaturedPick.__table__
+            # 지난 날짜는 지워서 테이블을 작게 유지
+            db.execute(delete(table).where(table.c.pick_date < day))
+            # 다른 워커가 먼저 저장했으면 그 선택을 그대로 사용
+            db.execute(
+                sqlite_insert(table).on_conflict_do_nothing(),
+                [{"pick_date": day, "position": i, "note_id": note_id} for i, note_id in enumerate(note_ids)],
+            )
+            db.commit()
+        cls._ensured = day
+        return day
 
+    @classmethod
+    def get_featured_notes(cls, db: Session, day: Optional[date] = None) -> List[Note]:
+        """Get the stored featured notes of a day (one query; call ensure_picks first)"""
+        return cls.picks_query(db, day or date.today()).all()
@@ -0,0 +1,79 @@
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+from app.models import KeywordTerm, NoteKeyword
+from app.services.vocabulary_cache import VocabularyCache, VocabularySnapshot
+
+
+class FlavorMap(NamedTuple):
+    """Flavor wheel lookups derived from one vocabulary snapshot"""
+    version: str
+    # (scope, term) -> ((level, label), ...) from the term up to its category
+    ancestors: Dict[Tuple[str, str], Tuple[Tuple[int, str], ...]]
+    # 대분류 / 중분류 label -> scope -> 자기 자신을 포함한 하위 키워드
+    descendants: Dict[str, Dict[str, Tuple[str, ...]]]
+
+
+def ancestor_chains(snapshot: VocabularySnapshot) -> Dict[Tuple[str, str], Tuple[Tuple[int, str], ...]]:
+    """(scope, term) -> ((level, label), ...) from the term up to its category"""
+    chains: Dict[Tuple[str, str], Tuple[Tuple[int, str], ...]] = {}
+    for scope, data in snapshot.scopes.items():
+        for category, info in data["categories"].items():
+            chains.setdefault((scope, info["term"]), ((1, category),))
+        for category, subcategories in data["subcategories"].items():
+            for subcategory, info in subcategories.items():
+                chains[(scope, info["term"])] = ((2, subcategory), (1, category))
+        for category, subcategories in data["hierarchy"].items():
+            for subcategory, terms in subcategories.items():
+                for term in terms:
+                    chains[(scope, term["term"])] = ((3, term["term"]), (2, subcategory), (1, category))
+    return chains
+
+
+def descendant_terms(
+    ancestors: Dict[Tuple[str, str], Tuple[Tuple[int, str], ...]]
+) -> Dict[str, Dict[str, Tuple[str, ...]]]:
+    """Invert the ancestor chains: label -> scope -> terms at or below it"""
+    found: Dict[str, Dict[str, set]] = {}
+    for (scope, term), chain in ancestors.items():
+        for level, label in chain:
+            if level < 3:
+                found.setdefault(label, {}).setdefault(scope, set()).add(term)
+    return {
+        label: {scope: tuple(sorted(terms)) for scope, terms in by_scope.items()}
+        for label, by_scope in found.items()
+    }
+
+
+class FlavorHierarchy:
+    """대분류 → 중분류 → 세부 키워드 계층 조회 (어휘 스냅샷 버전별로 한 번 계산)"""
+
+    _map: Optional[FlavorMap] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, db: Session) -> FlavorMap:
+        snapshot = VocabularyCache.get(db)
+        current = cls._map
+        if current is not None and current.version == snapshot.version:
+            return current
+        with cls._lock:
+            if cls._map is None or cls._map.version != snapshot.version:
+                ancestors = ancestor_chains(snapshot)
+                cls._map = FlavorMap(snapshot.version, ancestors, descendant_terms(ancestors))
+            return cls._map
+
+    @classmethod
+    def expand(cls, db: Session, label: str) -> Optional[Dict[str, Tuple[str, ...]]]:
+        """scope -> terms under a category / subcategory label, None for other words"""
+        return cls.get(db).descendants.get(label.strip())
+
+    @staticmethod
+    def note_ids(expansion: Dict[str, Tuple[str, ...]]):
+        """Ids of notes tagged with any expanded term: one IN over term ids (ix_note_keywords_term_id_note)"""
+        term_ids = select(KeywordTerm.id).where(or_(*[
+            and_(KeywordTerm.scope == scope, KeywordTerm.term.in_(terms))
+            for scope, terms in sorted(expansion.items())
+        ]))
+        return select(NoteKeyword.note_id).where(NoteKeyword.term_id.in_(term_ids))
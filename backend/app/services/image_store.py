@@ -0,0 +1,100 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import BinaryIO, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from app.models import Note
+
+
+# 경로는 실행 위치에 따라 조정 (backend 디렉토리에서 실행 가정)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+UPLOADS_DIR = os.environ.get("TASTING_NOTES_UPLOADS_DIR", os.path.join(BASE_DIR, "app", "uploads"))
+
+# 업로드 이미지 최대 크기 (MB), 청크 단위로 읽으면서 초과 즉시 중단
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", "20")) * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+_EXTENSION_RE = re.compile(r"^\.[a-z0-9]{1,8}$")
+_EXTENSION_ALIASES = {".jpeg": ".jpg", ".jpe": ".jpg", ".tif": ".tiff"}
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class StoredImage(NamedTuple):
+    image_path: str
+    created: bool  # False면 같은 사진이 이미 저장되어 있었음 (파생 이미지도 이미 요청됨)
+
+
+def _extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    ext = _EXTENSION_ALIASES.get(ext, ext)
+    return ext if _EXTENSION_RE.match(ext) else ""
+
+
+class ImageStore:
+    """Content-addressed image storage under UPLOADS_DIR
+
+    Files live at "<sha256[:2]>/<sha256><ext>", so identical uploads share
+    one file. Note.image_path holds that relative path and acts as the
+    reference count: a file is deleted only when no note points to it.
+    """
+
+    @staticmethod
+    def save(source: BinaryIO, filename: Optional[str] = None, max_bytes: int = MAX_UPLOAD_BYTES) -> Optional[StoredImage]:
+        """Stream an upload to disk in chunks and return where it is stored (None if empty)
+
+        Blocking; call through run_in_threadpool from async routes.
+        Raises UploadTooLarge as soon as more than max_bytes have been read.
+        """
+        os.makedirs(UPLOADS_DIR, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(prefix=".upload-", dir=UPLOADS_DIR)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLarge(f"Image exceeds {max_bytes // (1024 * 1024)}MB")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            if size == 0:
+                return None
+
+            sha = digest.hexdigest()
+            image_path = f"{sha[:2]}/{sha}{_extension(filename)}"
+            target = os.path.join(UPLOADS_DIR, image_path)
+            try:
+                # 같은 사진이 이미 저장되어 있음 (mtime 갱신: 노트 커밋 전에 GC 대상이 되지 않도록)
+                os.utime(target)
+                return StoredImage(image_path, created=False)
+            except FileNotFoundError:
+                pass
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+            return StoredImage(image_path, created=True)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def reference_count(db: Session, image_path: str) -> int:
+        return db.query(Note.id).filter(Note.image_path == image_path).count()
+
+    @staticmethod
+    def release(db: Session, image_path: Optional[str]) -> bool:
+        """Delete an image file once no note references it (call after commit)"""
+        if not image_path or ImageStore.reference_count(db, image_path) > 0:
+            return False
+        path = os.path.join(UPLOADS_DIR, image_path)
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
@@ -0,0 +1,192 @@
+import csv
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.models import Note, NoteKeyword
+from app.schemas import NoteImport
+from app.services.cooccurrence_service import CooccurrenceService
+from app.services.keyword_service import KeywordService
+from app.services.profile_service import ProfileService, note_profile
+from app.services.search_service import SearchService
+from app.services.similar_service import SimilarService
+from app.services.suggest_service import KeywordSuggestService
+from app.services.term_dictionary import TermDictionary
+
+
+IMPORT_FORMATS = ("jsonl", "csv")
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+
+class ImportRowError(NamedTuple):
+    row: int
+    error: str
+
+
+class ImportResult(NamedTuple):
+    imported: int
+    errors: List[ImportRowError]
+
+
+def detect_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    """Resolve the import format from an explicit value or the file extension"""
+    if fmt:
+        fmt = fmt.lower()
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        return fmt
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def _error_text(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
+        )
+    return str(exc).splitlines()[0] if str(exc) else exc.__class__.__name__
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (row number, raw record or parse error) without reading the whole file
+
+    CSV columns match NoteImport fields; the keywords column holds a JSON
+    array and empty cells are treated as missing values.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            row = {k: v for k, v in record.items() if k and v not in (None, "")}
+            if "keywords" in row:
+                try:
+                    row["keywords"] = json.loads(row["keywords"])
+                except ValueError as exc:
+                    yield reader.line_num, ValueError(f"keywords: invalid JSON ({exc})")
+                    continue
+            yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as exc:
+            yield line_no, ValueError(f"invalid JSON ({exc})")
+
+
+class ImportService:
+    """JSONL / CSV 노트 일괄 가져오기 (배치 단위 executemany)"""
+
+    @staticmethod
+    def import_notes(
+        db: Session,
+        records: Iterable[Tuple[int, Any]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> ImportResult:
+        """Validate and insert records, committing once per batch
+
+        Invalid rows are reported and skipped; the rest of the batch is
+        still imported.
+        """
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        imported = 0
+        errors: List[ImportRowError] = []
+        batch: List[Tuple[int, NoteImport]] = []
+
+        for row_no, record in records:
+            if isinstance(record, Exception):
+                errors.append(ImportRowError(row_no, _error_text(record)))
+                continue
+            try:
+                batch.append((row_no, NoteImport.model_validate(record)))
+            except ValidationError as exc:
+                errors.append(ImportRowError(row_no, _error_text(exc)))
+                continue
+            if len(batch) >= batch_size:
+                imported += ImportService._flush(db, batch, errors)
+                batch = []
+
+        if batch:
+            imported += ImportService._flush(db, batch, errors)
+        return ImportResult(imported=imported, errors=errors)
+
+    @staticmethod
+    def _flush(db: Session, batch: List[Tuple[int, NoteImport]], errors: List[ImportRowError]) -> int:
+        """Insert one batch; on a database error retry row by row to isolate it"""
+        try:
+            pairs = ImportService._insert_batch(db, [item for _, item in batch])
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            if len(batch) == 1:
+                errors.append(ImportRowError(batch[0][0], _error_text(exc)))
+                return 0
+            return sum(ImportService._flush(db, [entry], errors) for entry in batch)
+        KeywordSuggestService.apply_usage_delta(added=pairs)
+        SimilarService.mark_stale()
+        return len(batch)
+
+    @staticmethod
+    def _insert_batch(db: Session, items: List[NoteImport]) -> List[Tuple[str, str]]:
+        """Insert notes, keywords and search rows with three executemany calls"""
+        now = datetime.utcnow()
+        note_rows = []
+        for item in items:
+            values = item.model_dump(exclude={"keywords", "created_at"})
+            values["created_at"] = item.created_at or now
+            values["updated_at"] = now
+            note_rows.append(values)
+
+        # sort_by_parameter_order=True는 SQLite에서 행마다 INSERT 하므로 쓰지 않음.
+        # 여러 행 INSERT에서 rowid는 VALUES 순서대로 증가하므로 정렬하면 입력 순서와 같다.
+        note_table = Note.__table__
+        note_ids = sorted(db.execute(
+            insert(note_table).returning(note_table.c.id),
+            note_rows,
+        ).scalars().all())
+
+        keyword_rows = []
+        documents = []
+        for note_id, values, item in zip(note_ids, note_rows, items):
+            keywords_data = []
+            for idx, kw in enumerate(item.keywords):
+                kw_data = kw.model_dump()
+                if "position" not in kw.model_fields_set:
+                    kw_data["position"] = idx
+                keywords_data.append(kw_data)
+                keyword_rows.append(dict(kw_data, note_id=note_id))
+            documents.append((SimpleNamespace(id=note_id, **values), keywords_data))
+
+        if keyword_rows:
+            term_ids = TermDictionary.intern(db, [(row["scope"], row["term"], row.get("icon_key")) for row in keyword_rows])
+            db.execute(insert(NoteKeyword.__table__), [
+                {
+                    "note_id": row["note_id"],
+                    "scope": row["scope"],
+                    "term_id": term_ids[(row["scope"], row["term"])],
+                    "detail_text": row.get("detail_text"),
+                    "position": row["position"],
+                    "source_type": row.get("source_type", "vocabulary"),
+                }
+                for row in keyword_rows
+            ])
+        SearchService.index_notes(db, documents)
+        ProfileService.apply(db, added=[
+            note_profile(note, [(kw["scope"], kw["term"]) for kw in keywords_data])
+            for note, keywords_data in documents
+        ])
+        CooccurrenceService.apply(
+            db,
+            added=[[(kw["scope"], kw["term"]) for kw in keywords_data] for _, keywords_data in documents],
+            icons={(row["scope"], row["term"]): row.get("icon_key") for row in keyword_rows},
+        )
+        pairs = [(row["scope"], row["term"]) for row in keyword_rows]
+        KeywordService.apply_usage(db, added=pairs)
+        return pairs
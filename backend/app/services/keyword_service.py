@@ -1,5 +1,24 @@
-from sqlalchemy.orm import Session
+import unicodedata
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, bindparam, func, inspect, or_, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Query, Session
 from app.models import VocabularyTerm, UserTerm
+from app.services.vocabulary_cache import VocabularyCache, USER_TERMS_PER_SCOPE
+from app.services.suggest_service import KeywordSuggestService
+from app.services.term_dictionary import TermDictionary
+
+
+# 커스텀 키워드 페이지 크기 (작성 화면의 "더 보기")
+USER_TERMS_PAGE_SIZE = USER_TERMS_PER_SCOPE
+MAX_USER_TERMS_PAGE_SIZE = 100
+
+
+def normalize_term(term: str) -> str:
+    """Key for duplicate detection: NFC, collapsed whitespace, case-folded"""
+    return " ".join(unicodedata.normalize("NFC", term or "").split()).casefold()
 
 
 class KeywordService:
@@ -7,21 +26,135 @@ class KeywordService:
     def get_vocabulary_terms(db: Session, scope: str):
         """Get vocabulary terms for a scope"""
         return db.query(VocabularyTerm).filter(VocabularyTerm.scope == scope).all()
-    
+
     @staticmethod
-    def get_user_terms(db: Session, scope: str = None):
-        """Get user terms, optionally filtered by scope"""
-        query = db.query(UserTerm)
-        if scope:
-            query = query.filter(UserTerm.scope == scope)
-        return query.all()
-    
+    def user_terms_query(db: Session, scope: str, after: Optional[Tuple[int, int]] = None) -> Query:
+        """User terms of a scope, most used first (ix_user_terms_scope_usage), seeking past (usage_count, id)"""
+        query = db.query(UserTerm).filter(UserTerm.scope == scope)
+        if after is not None:
+            usage_count, term_id = after
+            query = query.filter(or_(
+                UserTerm.usage_count < usage_count,
+                and_(UserTerm.usage_count == usage_count, UserTerm.id > term_id),
+            ))
+        return query.order_by(UserTerm.usage_count.desc(), UserTerm.id)
+
+    @staticmethod
+    def get_user_terms(
+        db: Session,
+        scope: str,
+        limit: int = USER_TERMS_PAGE_SIZE,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> List[UserTerm]:
+        return KeywordService.user_terms_query(db, scope, after).limit(limit).all()
+
     @staticmethod
-    def create_user_term(db: Session, scope: str, term: str, icon_key: str = "custom"):
-        """Create a new user term"""
-        user_term = UserTerm(scope=scope, term=term, icon_key=icon_key)
-        db.add(user_term)
+    def create_user_term(db: Session, scope: str, term: str, icon_key: str = "custom") -> Tuple[UserTerm, bool]:
+        """Create a user term, or return the existing one with the same normalized text
+
+        Returns (user_term, created).
+        """
+        term = " ".join(term.split())
+        normalized = normalize_term(term)
+        if not normalized:
+            raise ValueError("Term must not be empty")
+
+        result = db.execute(
+            sqlite_insert(UserTerm.__table__).on_conflict_do_nothing(
+                index_elements=["scope", "normalized_term"]
+            ),
+            {
+                "scope": scope,
+                "term": term,
+                "normalized_term": normalized,
+                "icon_key": icon_key,
+                "usage_count": 0,
+                "created_at": datetime.utcnow(),
+            },
+        )
+        created = result.rowcount == 1
+        if created:
+            TermDictionary.intern(db, [(scope, term, icon_key)])
         db.commit()
-        db.refresh(user_term)
-        return user_term
 
+        user_term = db.query(UserTerm).filter(
+            UserTerm.scope == scope, UserTerm.normalized_term == normalized
+        ).one()
+        if created:
+            VocabularyCache.invalidate()
+            KeywordSuggestService.add_term(scope, term, icon_key, source_type="user")
+        return user_term, created
+
+    @staticmethod
+    def apply_usage(db: Session, removed: Iterable[Tuple[str, str]] = (), added: Iterable[Tuple[str, str]] = ()):
+        """Adjust user term usage counters by (scope, term) pairs (does not commit)
+
+        Pairs that are not custom terms match no row and cost one index probe.
+        """
+        deltas: Counter = Counter()
+        for sign, pairs in ((-1, removed), (1, added)):
+            for scope, term in pairs:
+                deltas[(scope, normalize_term(term))] += sign
+        rows = [
+            {"key_scope": scope, "key_normalized": normalized, "delta": delta}
+            for (scope, normalized), delta in deltas.items()
+            if delta
+        ]
+        if rows:
+            table = UserTerm.__table__
+            db.execute(
+                update(table).where(
+                    table.c.scope == bindparam("key_scope"),
+                    table.c.normalized_term == bindparam("key_normalized"),
+                ).values(usage_count=func.max(table.c.usage_count + bindparam("delta"), 0)),
+                rows,
+            )
+
+    @staticmethod
+    def migrate_user_terms(bind):
+        """Rebuild user_terms of databases created before normalized_term was NOT NULL
+
+        Keeps the oldest row per (scope, normalized term), counts usage from
+        note_keywords and copies the rows into the current schema, so
+        migrated and fresh databases match. Also repairs databases whose
+        normalized_term column was added as nullable.
+        """
+        columns = {column["name"]: column for column in inspect(bind).get_columns("user_terms")}
+        if "normalized_term" in columns and not columns["normalized_term"]["nullable"]:
+            return
+        table = UserTerm.__table__
+        with bind.begin() as conn:
+            keep: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            for row in conn.execute(text(
+                "SELECT id, scope, term, icon_key, created_by, created_at FROM user_terms ORDER BY id"
+            )).mappings():
+                key = (row["scope"], normalize_term(row["term"]))
+                if key not in keep:
+                    keep[key] = dict(row)
+
+            usage: Counter = Counter()
+            for scope, term, count in conn.execute(text(
+                "SELECT k.scope, k.term, COUNT(*) FROM note_keywords n "
+                "JOIN keyword_terms k ON k.id = n.term_id GROUP BY n.term_id"
+            )):
+                usage[(scope, normalize_term(term))] += count
+
+            old_indexes = conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'user_terms' AND sql IS NOT NULL"
+            )).scalars().all()
+            for name in old_indexes:
+                conn.execute(text(f'DROP INDEX "{name}"'))
+            conn.execute(text("ALTER TABLE user_terms RENAME TO user_terms_old"))
+            table.create(conn)
+            if keep:
+                conn.execute(
+                    text(
+                        "INSERT INTO user_terms (id, scope, term, normalized_term, icon_key, usage_count, created_by, created_at) "
+                        "VALUES (:id, :scope, :term, :normalized_term, :icon_key, :usage_count, :created_by, :created_at)"
+                    ),
+                    [
+                        dict(row, normalized_term=normalized, usage_count=usage.get((scope, normalized), 0))
+                        for (scope, normalized), row in keep.items()
+                    ],
+                )
+            conn.execute(text("DROP TABLE user_terms_old"))
@@ -1,10 +1,39 @@
-from sqlalchemy.orm import Session
+from collections import Counter
+from sqlalchemy import bindparam, delete, insert, update
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime
-from typing import List, Dict, Any
-from app.models import Note, NoteKeyword
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Tuple
+from app.models import KeywordTerm, Note, NoteKeyword
+from app.services.cooccurrence_service import CooccurrenceService
+from app.services.keyword_service import KeywordService
+from app.services.profile_service import ProfileService, PROFILE_DIMENSIONS, note_profile
+from app.services.search_service import SearchService
+from app.services.similar_service import SimilarService
+from app.services.suggest_service import KeywordSuggestService
+from app.services.term_dictionary import TermDictionary
+
+
+SCOPES = ("nose", "palate", "finish")
 
 
 class NoteService:
+    @staticmethod
+    def get_note(db: Session, note_id: int, with_keywords: bool = False) -> Optional[Note]:
+        """Load a note, optionally with its keywords in the same round trip"""
+        query = db.query(Note)
+        if with_keywords:
+            query = query.options(selectinload(Note.keywords))
+        return query.filter(Note.id == note_id).first()
+    
+    @staticmethod
+    def keywords_by_scope(note: Note) -> Dict[str, List[NoteKeyword]]:
+        """Group already-loaded keywords by scope (ordered by position)"""
+        grouped = {scope: [] for scope in SCOPES}
+        for keyword in note.keywords:
+            grouped.setdefault(keyword.scope, []).append(keyword)
+        return grouped
+    
     @staticmethod
     def create_note(
         db: Session,
@@ -50,19 +79,28 @@ class NoteService:
         
         # Add keywords
         if keywords_data:
+            term_ids = NoteService._intern_terms(db, keywords_data)
             for idx, kw_data in enumerate(keywords_data):
                 keyword = NoteKeyword(
                     note_id=note.id,
                     scope=kw_data.get("scope", ""),
-                    term=kw_data.get("term", ""),
-                    icon_key=kw_data.get("icon_key"),
+                    term_id=term_ids[(kw_data.get("scope", ""), kw_data.get("term", ""))],
                     detail_text=kw_data.get("detail_text"),
                     position=kw_data.get("position", idx),
                     source_type=kw_data.get("source_type", "vocabulary")
                 )
                 db.add(keyword)
         
+        SearchService.index_note(db, note, keywords_data)
+        ProfileService.apply(db, added=[note_profile(note, NoteService._keyword_pairs(keywords_data))])
+        CooccurrenceService.apply(
+            db, added=[NoteService._keyword_pairs(keywords_data)], icons=NoteService._keyword_icons(keywords_data)
+        )
+        KeywordService.apply_usage(db, added=NoteService._keyword_pairs(keywords_data))
+        
         db.commit()
+        KeywordSuggestService.apply_usage_delta(added=NoteService._keyword_pairs(keywords_data))
+        SimilarService.update_note(note.id, note.is_draft, NoteService._keyword_entries(keywords_data))
         db.refresh(note)
         return note
     
@@ -89,6 +127,11 @@ class NoteService:
         keywords_data: List[Dict[str, Any]] = None
     ) -> Note:
         """Update a note and its keywords"""
+        # 프로필 집계에서 뺄 수정 전 값
+        before = SimpleNamespace(**{
+            field: getattr(note, field) for field in PROFILE_DIMENSIONS + ("score", "abv", "is_draft")
+        })
+        
         if name is not None:
             note.name = name
         if distillery is not None:
@@ -124,24 +167,134 @@ class NoteService:
         
         note.updated_at = datetime.utcnow()
         
-        # Delete existing keywords
-        db.query(NoteKeyword).filter(NoteKeyword.note_id == note.id).delete()
+        # 저장된 키워드와 비교해서 바뀐 행만 반영
+        removed, added = NoteService._sync_keywords(db, note.id, keywords_data)
         
-        # Add new keywords
-        if keywords_data:
-            for idx, kw_data in enumerate(keywords_data):
-                keyword = NoteKeyword(
-                    note_id=note.id,
-                    scope=kw_data.get("scope", ""),
-                    term=kw_data.get("term", ""),
-                    icon_key=kw_data.get("icon_key"),
-                    detail_text=kw_data.get("detail_text"),
-                    position=kw_data.get("position", idx),
-                    source_type=kw_data.get("source_type", "vocabulary")
-                )
-                db.add(keyword)
+        SearchService.index_note(db, note, keywords_data)
+        
+        # 수정 전 키워드 = 수정 후 - 추가 + 삭제
+        new_pairs = NoteService._keyword_pairs(keywords_data)
+        old_pairs = list((Counter(new_pairs) - Counter(added) + Counter(removed)).elements())
+        ProfileService.apply(
+            db,
+            removed=[note_profile(before, old_pairs)],
+            added=[note_profile(note, new_pairs)],
+        )
+        if set(old_pairs) != set(new_pairs):
+            CooccurrenceService.apply(
+                db, removed=[old_pairs], added=[new_pairs], icons=NoteService._keyword_icons(keywords_data)
+            )
+        KeywordService.apply_usage(db, removed=removed, added=added)
         
         db.commit()
+        KeywordSuggestService.apply_usage_delta(removed=removed, added=added)
+        SimilarService.update_note(note.id, note.is_draft, NoteService._keyword_entries(keywords_data))
         db.refresh(note)
         return note
-
+    
+    @staticmethod
+    def delete_note(db: Session, note: Note) -> None:
+        """Delete a note, its keywords and its search index row"""
+        note_id = note.id
+        old_pairs = db.query(KeywordTerm.scope, KeywordTerm.term).join(
+            NoteKeyword, NoteKeyword.term_id == KeywordTerm.id
+        ).filter(NoteKeyword.note_id == note_id).all()
+        SearchService.remove_note(db, note.id)
+        ProfileService.apply(db, removed=[note_profile(note, [tuple(pair) for pair in old_pairs])])
+        CooccurrenceService.apply(db, removed=[[tuple(pair) for pair in old_pairs]])
+        KeywordService.apply_usage(db, removed=[tuple(pair) for pair in old_pairs])
+        db.delete(note)
+        db.commit()
+        KeywordSuggestService.apply_usage_delta(removed=[tuple(pair) for pair in old_pairs])
+        SimilarService.remove_note(note_id)
+    
+    @staticmethod
+    def _sync_keywords(
+        db: Session, note_id: int, keywords_data: List[Dict[str, Any]]
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """Diff keywords_data against stored rows by term id and position
+        
+        Issues at most one batched DELETE, UPDATE and INSERT and nothing at
+        all when the keywords are unchanged. Returns the (scope, term) pairs
+        removed from and added to the note.
+        """
+        table = NoteKeyword.__table__
+        stored = db.query(
+            NoteKeyword.id, NoteKeyword.term_id, KeywordTerm.scope, KeywordTerm.term, NoteKeyword.position,
+            NoteKeyword.detail_text, NoteKeyword.source_type
+        ).join(KeywordTerm, KeywordTerm.id == NoteKeyword.term_id).filter(
+            NoteKeyword.note_id == note_id
+        ).order_by(NoteKeyword.position).all()
+        
+        # 같은 키워드가 여러 번 있을 수 있으므로 목록으로 보관
+        existing: Dict[int, List[Any]] = {}
+        for row in stored:
+            existing.setdefault(row.term_id, []).append(row)
+        
+        term_ids = NoteService._intern_terms(db, keywords_data)
+        inserts, updates, added = [], [], []
+        for idx, kw_data in enumerate(keywords_data or []):
+            key = (kw_data.get("scope", ""), kw_data.get("term", ""))
+            values = {
+                "scope": key[0],
+                "term_id": term_ids[key],
+                "detail_text": kw_data.get("detail_text"),
+                "position": kw_data.get("position", idx),
+                "source_type": kw_data.get("source_type", "vocabulary"),
+            }
+            candidates = existing.get(values["term_id"])
+            if not candidates:
+                inserts.append(dict(values, note_id=note_id))
+                added.append(key)
+                continue
+            # 같은 위치의 행을 우선 재사용
+            row = next((r for r in candidates if r.position == values["position"]), candidates[0])
+            candidates.remove(row)
+            if (row.position, row.detail_text, row.source_type) != (
+                values["position"], values["detail_text"], values["source_type"]
+            ):
+                updates.append({
+                    "keyword_id": row.id,
+                    "new_position": values["position"],
+                    "new_detail_text": values["detail_text"],
+                    "new_source_type": values["source_type"],
+                })
+        
+        leftover = [row for rows in existing.values() for row in rows]
+        if leftover:
+            db.execute(delete(table).where(table.c.id.in_([row.id for row in leftover])))
+        if updates:
+            db.execute(
+                update(table).where(table.c.id == bindparam("keyword_id")).values(
+                    position=bindparam("new_position"),
+                    detail_text=bindparam("new_detail_text"),
+                    source_type=bindparam("new_source_type"),
+                ),
+                updates,
+            )
+        if inserts:
+            db.execute(insert(table), inserts)
+        
+        removed = [(row.scope, row.term) for row in leftover]
+        return removed, added
+    
+    @staticmethod
+    def _intern_terms(db: Session, keywords_data: List[Dict[str, Any]]):
+        return TermDictionary.intern(db, [
+            (kw.get("scope", ""), kw.get("term", ""), kw.get("icon_key")) for kw in keywords_data or []
+        ])
+    
+    @staticmethod
+    def _keyword_pairs(keywords_data: List[Dict[str, Any]]):
+        return [(kw.get("scope", ""), kw.get("term", "")) for kw in keywords_data or []]
+    
+    @staticmethod
+    def _keyword_icons(keywords_data: List[Dict[str, Any]]):
+        return {(kw.get("scope", ""), kw.get("term", "")): kw.get("icon_key") for kw in keywords_data or []}
+    
+    @staticmethod
+    def _keyword_entries(keywords_data: List[Dict[str, Any]]):
+        return [
+            (kw.get("scope", ""), kw.get("term", ""), kw.get("position", idx))
+            for idx, kw in enumerate(keywords_data or [])
+        ]
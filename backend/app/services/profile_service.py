@@ -0,0 +1,180 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app.models import KeywordTerm, Note, NoteKeyword, ProfileKeywordStat, ProfileStat
+from app.services.aggregates import built_version, mark_built, prune_zero, upsert_deltas
+from app.services.flavor_hierarchy import FlavorHierarchy
+
+
+PROFILE_DIMENSIONS = ("distillery", "cask_type")
+DEFAULT_TOP_KEYWORDS = 10
+MAX_TOP_KEYWORDS = 50
+
+# 집계 방식이 바뀌면 값을 올려서 다음 시작 시 다시 계산
+PROFILE_STATS_KEY = "profile_stats_version"
+PROFILE_STATS_VERSION = "1"
+
+
+class NoteProfile(NamedTuple):
+    """What one note contributes to the profile aggregates"""
+    dimensions: Tuple[Tuple[str, str], ...]
+    score: Optional[float]
+    abv: Optional[float]
+    keywords: Tuple[Tuple[str, str], ...]  # (scope, term)
+
+
+def note_profile(note: Any, keyword_pairs: Iterable[Tuple[str, str]]) -> Optional[NoteProfile]:
+    """Contribution of a note in its current state (None for drafts)"""
+    if note.is_draft:
+        return None
+    dimensions = tuple(
+        (dimension, getattr(note, dimension).strip())
+        for dimension in PROFILE_DIMENSIONS
+        if getattr(note, dimension) and getattr(note, dimension).strip()
+    )
+    return NoteProfile(dimensions, note.score, note.abv, tuple(keyword_pairs))
+
+
+class ProfileService:
+    """증류소 / 캐스크 종류별 Flavor 프로필 집계 (노트 변경 시 증분 갱신)
+
+    profile_stats holds note counts and score / ABV sums per
+    (dimension, value); profile_keyword_stats holds keyword counts rolled
+    up through the flavor wheel. Only published notes are counted. Writes
+    go through apply(), which turns before / after NoteProfiles into one
+    batched upsert per table inside the caller's transaction.
+    """
+
+    @classmethod
+    def apply(
+        cls,
+        db: Session,
+        removed: Iterable[Optional[NoteProfile]] = (),
+        added: Iterable[Optional[NoteProfile]] = (),
+    ):
+        """Subtract removed and add added contributions (does not commit)"""
+        chains = None
+        stat_deltas: Dict[Tuple[str, str], List[float]] = {}
+        keyword_deltas: Counter = Counter()
+
+        for sign, profiles in ((-1, removed), (1, added)):
+            for profile in profiles:
+                if profile is None or not profile.dimensions:
+                    continue
+                if chains is None:
+                    chains = FlavorHierarchy.get(db).ancestors
+                labels = Counter()
+                for scope, term in profile.keywords:
+                    for level, label in chains.get((scope, term), ((3, term),)):
+                        labels[(scope, level, label)] += 1
+                for dimension, value in profile.dimensions:
+                    delta = stat_deltas.setdefault((dimension, value), [0, 0.0, 0, 0.0, 0])
+                    delta[0] += sign
+                    if profile.score is not None:
+                        delta[1] += sign * profile.score
+                        delta[2] += sign
+                    if profile.abv is not None:
+                        delta[3] += sign * profile.abv
+                        delta[4] += sign
+                    for (scope, level, label), count in labels.items():
+                        keyword_deltas[(dimension, value, scope, level, label)] += sign * count
+
+        # 수정 전후가 같으면 (예: 이름만 변경) 쓰기 없음
+        stat_rows = [
+            {"dimension": d, "value": v, "note_count": n, "score_sum": s, "score_count": sc, "abv_sum": a, "abv_count": ac}
+            for (d, v), (n, s, sc, a, ac) in stat_deltas.items()
+            if (n, s, sc, a, ac) != (0, 0.0, 0, 0.0, 0)
+        ]
+        keyword_rows = [
+            {"dimension": d, "value": v, "scope": scope, "level": level, "label": label, "count": count}
+            for (d, v, scope, level, label), count in keyword_deltas.items()
+            if count
+        ]
+        if stat_rows:
+            upsert_deltas(db, ProfileStat.__table__, ("dimension", "value"), stat_rows)
+            prune_zero(db, ProfileStat.__table__, "note_count", stat_rows)
+        if keyword_rows:
+            upsert_deltas(db, ProfileKeywordStat.__table__, ("dimension", "value", "scope", "level", "label"), keyword_rows)
+            prune_zero(db, ProfileKeywordStat.__table__, "count", keyword_rows)
+
+    @classmethod
+    def rebuild(cls, db: Session, batch_size: int = 500):
+        """Recompute every aggregate from notes and note_keywords"""
+        db.execute(delete(ProfileStat.__table__))
+        db.execute(delete(ProfileKeywordStat.__table__))
+        notes = db.query(Note).filter(Note.is_draft == False).order_by(Note.id).yield_per(batch_size)
+        batch: List[Note] = []
+        for note in notes:
+            batch.append(note)
+            if len(batch) >= batch_size:
+                cls._apply_notes(db, batch)
+                batch = []
+        if batch:
+            cls._apply_notes(db, batch)
+
+        mark_built(db, PROFILE_STATS_KEY, PROFILE_STATS_VERSION)
+        db.commit()
+
+    @classmethod
+    def _apply_notes(cls, db: Session, notes: List[Note]):
+        pairs: Dict[int, List[Tuple[str, str]]] = {note.id: [] for note in notes}
+        rows = db.query(NoteKeyword.note_id, KeywordTerm.scope, KeywordTerm.term).join(
+            KeywordTerm, KeywordTerm.id == NoteKeyword.term_id
+        ).filter(NoteKeyword.note_id.in_(list(pairs)))
+        for note_id, scope, term in rows:
+            pairs[note_id].append((scope, term))
+        cls.apply(db, added=[note_profile(note, pairs[note.id]) for note in notes])
+
+    @classmethod
+    def init_stats(cls, bind):
+        """Build the aggregates once for databases created before they existed"""
+        with Session(bind=bind) as db:
+            if built_version(db, PROFILE_STATS_KEY) != PROFILE_STATS_VERSION:
+                cls.rebuild(db)
+
+    @staticmethod
+    def get_profile(db: Session, dimension: str, value: str, limit: int = DEFAULT_TOP_KEYWORDS) -> Optional[Dict[str, Any]]:
+        """Profile for one distillery / cask type with two indexed queries"""
+        stat = db.get(ProfileStat, (dimension, value))
+        if stat is None:
+            return None
+
+        rows = db.execute(ProfileService.top_keywords(dimension, value, limit)).all()
+        keywords: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for scope, level, label, count in rows:
+            keywords.setdefault(scope, {}).setdefault(str(level), []).append({"label": label, "count": count})
+
+        return {
+            "dimension": dimension,
+            "value": value,
+            "note_count": stat.note_count,
+            "avg_score": round(stat.score_sum / stat.score_count, 1) if stat.score_count else None,
+            "avg_abv": round(stat.abv_sum / stat.abv_count, 1) if stat.abv_count else None,
+            "keywords": keywords,
+        }
+
+    @staticmethod
+    def top_keywords(dimension: str, value: str, limit: int = DEFAULT_TOP_KEYWORDS):
+        """Top labels per (scope, level), read in index order (ix_profile_keyword_stats_top)"""
+        table = ProfileKeywordStat.__table__
+        rank = func.row_number().over(
+            partition_by=(table.c.scope, table.c.level),
+            order_by=(table.c.count.desc(), table.c.label),
+        ).label("rank")
+        ranked = select(table.c.scope, table.c.level, table.c.label, table.c.count, rank).where(
+            table.c.dimension == dimension, table.c.value == value
+        ).subquery()
+        return (
+            select(ranked.c.scope, ranked.c.level, ranked.c.label, ranked.c.count)
+            .where(ranked.c.rank <= limit)
+            .order_by(ranked.c.scope, ranked.c.level, ranked.c.rank)
+        )
+
+    @staticmethod
+    def top_values(db: Session, dimension: str, limit: int = DEFAULT_TOP_KEYWORDS) -> List[Dict[str, Any]]:
+        """Distilleries / cask types with the most published notes"""
+        rows = db.query(ProfileStat.value, ProfileStat.note_count).filter(
+            ProfileStat.dimension == dimension
+        ).order_by(ProfileStat.note_count.desc(), ProfileStat.value).limit(limit).all()
+        return [{"value": value, "note_count": note_count} for value, note_count in rows]
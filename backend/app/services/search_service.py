@@ -0,0 +1,187 @@
+import re
+from typing import List, Dict, Any, Optional
+from sqlalchemy import text, func, literal_column, select, table, column
+from sqlalchemy.orm import Session
+from app.models import KeywordTerm, Note, NoteKeyword
+
+
+# FTS5 인덱스 테이블 (rowid = notes.id)
+# 한국어는 공백 단위 토큰화가 맞지 않으므로 Python에서 2-gram으로 쪼갠 문자열을 저장하고
+# FTS5는 unicode61로 그 2-gram 토큰만 색인한다.
+FTS_TABLE = "notes_fts"
+FTS_COLUMNS = ("name", "distillery", "keywords", "comments")
+
+# bm25 컬럼 가중치 (FTS_COLUMNS 순서)
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+notes_fts = table(FTS_TABLE, column("rowid"), *[column(c) for c in FTS_COLUMNS])
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(value: Optional[str]) -> List[str]:
+    """Split text into lower-cased word tokens"""
+    if not value:
+        return []
+    return _WORD_RE.findall(value.lower())
+
+
+def _ngrams(token: str) -> List[str]:
+    """2-grams of a token, followed by its last character
+
+    The trailing unigram lets single-character queries match at any position
+    through a prefix query.
+    """
+    if len(token) < 2:
+        return [token]
+    grams = [token[i:i + 2] for i in range(len(token) - 1)]
+    grams.append(token[-1])
+    return grams
+
+
+def _to_index_text(*values: Optional[str]) -> str:
+    grams = []
+    for value in values:
+        for token in _tokens(value):
+            grams.extend(_ngrams(token))
+    return " ".join(grams)
+
+
+def _word_to_match(word: str) -> Optional[str]:
+    """Build the FTS5 expression for one search word"""
+    phrases = []
+    for token in _tokens(word):
+        if len(token) == 1:
+            phrases.append(f'"{token}"*')
+        else:
+            bigrams = [token[i:i + 2] for i in range(len(token) - 1)]
+            phrases.append('"' + " ".join(bigrams) + '"')
+    if not phrases:
+        return None
+    if len(phrases) == 1:
+        return phrases[0]
+    return "(" + " AND ".join(phrases) + ")"
+
+
+class SearchService:
+    """노트 전문 검색 인덱스 (SQLite FTS5) 관리"""
+
+    @staticmethod
+    def init_index(bind):
+        """Create the FTS5 table and backfill it when out of sync with notes"""
+        with bind.begin() as conn:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize='unicode61')"
+            ))
+            note_count = conn.execute(text("SELECT COUNT(*) FROM notes")).scalar()
+            index_count = conn.execute(text(f"SELECT COUNT(*) FROM {FTS_TABLE}")).scalar()
+        if note_count != index_count:
+            with Session(bind=bind) as db:
+                SearchService.rebuild_index(db)
+
+    @staticmethod
+    def rebuild_index(db: Session, batch_size: int = 500):
+        """Rebuild the whole index from notes and note_keywords"""
+        db.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        last_id = 0
+        while True:
+            notes = (
+                db.query(Note)
+                .filter(Note.id > last_id)
+                .order_by(Note.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not notes:
+                break
+            note_ids = [n.id for n in notes]
+            keywords: Dict[int, List[Dict[str, Any]]] = {}
+            rows = db.query(
+                NoteKeyword.note_id, KeywordTerm.term, NoteKeyword.detail_text
+            ).join(KeywordTerm, KeywordTerm.id == NoteKeyword.term_id).filter(
+                NoteKeyword.note_id.in_(note_ids)
+            ).all()
+            for note_id, term, detail_text in rows:
+                keywords.setdefault(note_id, []).append(
+                    {"term": term, "detail_text": detail_text}
+                )
+            SearchService.index_notes(db, [(n, keywords.get(n.id, [])) for n in notes])
+            last_id = note_ids[-1]
+        db.commit()
+
+    @staticmethod
+    def _document(note: Note, keywords_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        keyword_values = []
+        for kw in keywords_data or []:
+            keyword_values.append(kw.get("term"))
+            keyword_values.append(kw.get("detail_text"))
+        return {
+            "rowid": note.id,
+            "name": _to_index_text(note.name),
+            "distillery": _to_index_text(note.distillery),
+            "keywords": _to_index_text(*keyword_values),
+            "comments": _to_index_text(
+                note.nose_comment,
+                note.palate_comment,
+                note.finish_comment,
+                note.overall_comment,
+            ),
+        }
+
+    @staticmethod
+    def index_note(db: Session, note: Note, keywords_data: List[Dict[str, Any]] = None):
+        """Insert or replace a note's index row (caller commits)"""
+        SearchService.remove_note(db, note.id)
+        db.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+                f"VALUES (:rowid, :name, :distillery, :keywords, :comments)"
+            ),
+            SearchService._document(note, keywords_data),
+        )
+
+    @staticmethod
+    def index_notes(db: Session, documents: List[Any]):
+        """Insert index rows for new notes in one executemany (caller commits)
+
+        documents: (note, keywords_data) pairs
+        """
+        if not documents:
+            return
+        db.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+                f"VALUES (:rowid, :name, :distillery, :keywords, :comments)"
+            ),
+            [SearchService._document(note, keywords_data) for note, keywords_data in documents],
+        )
+
+    @staticmethod
+    def remove_note(db: Session, note_id: int):
+        """Delete a note's index row (caller commits)"""
+        db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {"rowid": note_id})
+
+    @staticmethod
+    def build_match(search_terms: List[str], search_mode: str = "AND") -> Optional[str]:
+        """Translate board search words into an FTS5 MATCH expression"""
+        expressions = [e for e in (_word_to_match(t) for t in search_terms) if e]
+        if not expressions:
+            return None
+        joiner = " OR " if search_mode == "OR" else " AND "
+        return joiner.join(expressions)
+
+    @staticmethod
+    def match_subquery(match: str):
+        """Subquery of (note_id, rank) for a MATCH expression, best match first"""
+        rank = func.bm25(literal_column(FTS_TABLE), *FTS_WEIGHTS)
+        return (
+            select(notes_fts.c.rowid.label("note_id"), rank.label("rank"))
+            .where(literal_column(FTS_TABLE).op("MATCH")(match))
+            .subquery("search_hits")
+        )
+
+    @staticmethod
+    def match_ids(match: str):
+        """Note ids for a MATCH expression, unranked (for IN filters)"""
+        return select(notes_fts.c.rowid).where(literal_column(FTS_TABLE).op("MATCH")(match))
@@ -0,0 +1,269 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from app.models import KeywordTerm, Note, NoteKeyword
+from app.services.vocabulary_cache import CACHE_TTL_SECONDS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy가 없으면 비슷한 노트 추천을 끔
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+SIMILAR_TOP_K = 6
+MAX_SIMILAR = 50
+# scope 안에서 n번째 키워드의 가중치 = 1 / (1 + POSITION_DECAY * n)
+POSITION_DECAY = 0.5
+# 마지막 빌드 이후 바뀐 노트가 이만큼 쌓이면 메모리 안에서 행렬을 다시 만듦
+COMPACT_THRESHOLD = 1024
+# 다른 워커에서 저장된 노트를 반영하기 위한 전체 재빌드 주기 (백그라운드)
+SIMILAR_REFRESH_SECONDS = CACHE_TTL_SECONDS
+
+# (scope, term, position)
+KeywordEntry = Tuple[str, str, int]
+
+
+def _weights(entries: Iterable[KeywordEntry]) -> Dict[Tuple[str, str], float]:
+    """(scope, term) -> weight from the keyword's rank within its scope"""
+    by_scope: Dict[str, List[Tuple[int, int, str]]] = {}
+    for order, (scope, term, position) in enumerate(entries):
+        by_scope.setdefault(scope, []).append((position or 0, order, term))
+    weights: Dict[Tuple[str, str], float] = {}
+    for scope, items in by_scope.items():
+        for rank, (_, _, term) in enumerate(sorted(items)):
+            key = (scope, term)
+            weights[key] = weights.get(key, 0.0) + 1.0 / (1.0 + POSITION_DECAY * rank)
+    return weights
+
+
+def _vector(columns: Dict[Tuple[str, str], int], entries: Iterable[KeywordEntry]):
+    """(column ids, unit weights) for keywords, or None; new terms get new columns"""
+    weights = _weights(entries)
+    if not weights:
+        return None
+    cols = np.fromiter(
+        (columns.setdefault(key, len(columns)) for key in weights), dtype=np.int32, count=len(weights)
+    )
+    vals = np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+    vals /= np.linalg.norm(vals)
+    return cols, vals
+
+
+class _SimilarIndex:
+    """L2-normalized keyword vectors of published notes
+
+    The rows built from the database are kept as CSR arrays (indptr /
+    indices / data) plus a column-major copy used for scoring, so a query
+    only touches the postings of its own terms. Notes written afterwards
+    live in a small delta map until the next compaction.
+    """
+
+    def __init__(self, columns: Dict[Tuple[str, str], int], rows: List[Tuple[int, "np.ndarray", "np.ndarray"]]):
+        self.columns = columns
+        self.built_at = time.monotonic()
+        n_rows = len(rows)
+        self.note_ids = np.fromiter((note_id for note_id, _, _ in rows), dtype=np.int64, count=n_rows)
+        self.row_of = {int(note_id): row for row, note_id in enumerate(self.note_ids)}
+        lengths = np.fromiter((len(cols) for _, cols, _ in rows), dtype=np.int64, count=n_rows)
+        self.indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = np.concatenate([cols for _, cols, _ in rows]) if rows else np.zeros(0, dtype=np.int32)
+        self.data = np.concatenate([vals for _, _, vals in rows]) if rows else np.zeros(0, dtype=np.float32)
+
+        # 열(키워드) 기준 복사본: 키워드별 (행, 가중치) 목록
+        n_cols = len(columns)
+        order = np.argsort(self.indices, kind="stable")
+        self.col_rows = np.repeat(np.arange(n_rows, dtype=np.int32), lengths)[order]
+        self.col_data = self.data[order]
+        self.col_indptr = np.zeros(n_cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=n_cols), out=self.col_indptr[1:])
+
+        self.alive = np.ones(n_rows, dtype=bool)
+        self.delta: Dict[int, Optional[Tuple["np.ndarray", "np.ndarray"]]] = {}
+
+    def vector(self, entries: Iterable[KeywordEntry]):
+        return _vector(self.columns, entries)
+
+    def set(self, note_id: int, vector: Optional[Tuple["np.ndarray", "np.ndarray"]]):
+        row = self.row_of.get(note_id)
+        if row is not None:
+            self.alive[row] = False
+        self.delta[note_id] = vector
+
+    def rows(self) -> List[Tuple[int, "np.ndarray", "np.ndarray"]]:
+        """Current vectors (base rows still alive, then the delta)"""
+        rows = [
+            (int(self.note_ids[row]), self.indices[self.indptr[row]:self.indptr[row + 1]],
+             self.data[self.indptr[row]:self.indptr[row + 1]])
+            for row in np.flatnonzero(self.alive)
+        ]
+        rows.extend((note_id, vec[0], vec[1]) for note_id, vec in self.delta.items() if vec is not None)
+        return rows
+
+    def top_k(self, cols: "np.ndarray", vals: "np.ndarray", k: int, exclude: int) -> List[Tuple[int, float]]:
+        n_rows = len(self.note_ids)
+        known = cols < len(self.col_indptr) - 1
+        q_cols, q_vals = cols[known], vals[known]
+        starts, ends = self.col_indptr[q_cols], self.col_indptr[q_cols + 1]
+        lengths = ends - starts
+        if lengths.sum():
+            postings = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+            scores = np.bincount(
+                self.col_rows[postings],
+                weights=self.col_data[postings] * np.repeat(q_vals, lengths),
+                minlength=n_rows,
+            )
+            scores[~self.alive] = 0.0
+        else:
+            scores = np.zeros(n_rows)
+        row = self.row_of.get(exclude)
+        if row is not None:
+            scores[row] = 0.0
+
+        candidates: List[Tuple[float, int]] = []
+        if n_rows:
+            take = min(k, n_rows)
+            best = np.argpartition(scores, n_rows - take)[n_rows - take:]
+            candidates = [(float(scores[r]), int(self.note_ids[r])) for r in best if scores[r] > 0]
+
+        # 빌드 이후 저장된 노트 (COMPACT_THRESHOLD개 이하)
+        query = dict(zip(cols.tolist(), vals.tolist()))
+        for note_id, vec in self.delta.items():
+            if vec is None or note_id == exclude:
+                continue
+            score = sum(query.get(c, 0.0) * v for c, v in zip(vec[0].tolist(), vec[1].tolist()))
+            if score > 0:
+                candidates.append((score, note_id))
+
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        return [(note_id, score) for score, note_id in candidates[:k]]
+
+
+class SimilarService:
+    """비슷한 노트 추천 (키워드 벡터 코사인 유사도, 프로세스 단위 인덱스)
+
+    Each note is a sparse vector over (scope, term) columns, so nose,
+    palate and finish form separate blocks. Writes in this process are
+    applied immediately; writes from other workers show up after the
+    periodic background rebuild.
+    """
+
+    _index: Optional[_SimilarIndex] = None
+    _lock = threading.RLock()
+    _refreshing = False
+    # 백그라운드 재빌드 중에 들어온 변경 (교체 후 다시 적용)
+    _replay: List[Tuple[int, Optional[List[KeywordEntry]]]] = []
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    @staticmethod
+    def _build(db: Session) -> _SimilarIndex:
+        rows = db.query(
+            NoteKeyword.note_id, KeywordTerm.scope, KeywordTerm.term, NoteKeyword.position
+        ).join(Note, Note.id == NoteKeyword.note_id).join(
+            KeywordTerm, KeywordTerm.id == NoteKeyword.term_id
+        ).filter(Note.is_draft == False).order_by(
+            NoteKeyword.note_id, NoteKeyword.position, NoteKeyword.id
+        ).yield_per(5000)
+
+        columns: Dict[Tuple[str, str], int] = {}
+        vectors: List[Tuple[int, "np.ndarray", "np.ndarray"]] = []
+        current_id, entries = None, []
+        for note_id, scope, term, position in rows:
+            if note_id != current_id:
+                if entries:
+                    vectors.append((current_id, *_vector(columns, entries)))
+                current_id, entries = note_id, []
+            entries.append((scope, term, position))
+        if entries:
+            vectors.append((current_id, *_vector(columns, entries)))
+        return _SimilarIndex(columns, vectors)
+
+    @classmethod
+    def ensure_index(cls, db: Session) -> Optional[_SimilarIndex]:
+        """Build the index on first use; schedule a background refresh when stale"""
+        if not cls.available():
+            return None
+        with cls._lock:
+            index = cls._index
+            if index is None:
+                index = cls._index = cls._build(db)
+            elif time.monotonic() - index.built_at >= SIMILAR_REFRESH_SECONDS and not cls._refreshing:
+                cls._refreshing = True
+                cls._replay = []
+                threading.Thread(target=cls._refresh, name="similar-index-refresh", daemon=True).start()
+            return index
+
+    @classmethod
+    def _refresh(cls):
+        try:
+            with SessionLocal() as db:
+                index = cls._build(db)
+            with cls._lock:
+                for note_id, entries in cls._replay:
+                    index.set(note_id, index.vector(entries) if entries else None)
+                cls._index = index
+        except Exception:
+            logger.exception("Similar-notes index refresh failed")
+        finally:
+            with cls._lock:
+                cls._refreshing = False
+                cls._replay = []
+
+    @classmethod
+    def similar(cls, db: Session, note: Note, k: int = SIMILAR_TOP_K) -> List[Tuple[int, float]]:
+        """[(note_id, cosine similarity)] for the k most similar published notes"""
+        index = cls.ensure_index(db)
+        if index is None:
+            return []
+        entries = [(kw.scope, kw.term, kw.position) for kw in note.keywords]
+        with cls._lock:
+            vector = index.vector(entries)
+            if vector is None:
+                return []
+            return index.top_k(vector[0], vector[1], k, exclude=note.id)
+
+    @classmethod
+    def similar_notes(cls, db: Session, note: Note, k: int = SIMILAR_TOP_K) -> List[Tuple[Note, float]]:
+        """Similar published notes with their scores, loaded with one IN query"""
+        ranked = cls.similar(db, note, k)
+        if not ranked:
+            return []
+        notes = {
+            n.id: n for n in db.query(Note).filter(
+                Note.id.in_([note_id for note_id, _ in ranked]), Note.is_draft == False
+            )
+        }
+        return [(notes[note_id], score) for note_id, score in ranked if note_id in notes]
+
+    @classmethod
+    def update_note(cls, note_id: int, is_draft: bool, entries: Optional[List[KeywordEntry]]):
+        """Apply a committed note write to this process's index"""
+        entries = None if is_draft else entries
+        with cls._lock:
+            if cls._refreshing:
+                cls._replay.append((note_id, entries))
+            index = cls._index
+            if index is None:
+                return
+            index.set(note_id, index.vector(entries) if entries else None)
+            if len(index.delta) >= COMPACT_THRESHOLD:
+                cls._index = _SimilarIndex(index.columns, index.rows())
+
+    @classmethod
+    def remove_note(cls, note_id: int):
+        cls.update_note(note_id, True, None)
+
+    @classmethod
+    def mark_stale(cls):
+        """Rebuild in the background on next use (e.g. after a bulk import)"""
+        with cls._lock:
+            if cls._index is not None:
+                cls._index.built_at = float("-inf")
@@ -0,0 +1,174 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import KeywordTerm, VocabularyTerm, UserTerm, NoteKeyword
+from app.services.vocabulary_cache import CACHE_TTL_SECONDS
+
+
+# ========== 한글 자모 분해 ==========
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+              "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# 겹모음/겹받침은 키 입력 순서대로 풀어서 비교 (입력 중인 글자도 접두어로 매칭되도록)
+_COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+
+def decompose_jamo(text: str) -> str:
+    """Spell text as keystroke-order jamo, e.g. "바닐라" -> "ㅂㅏㄴㅣㄹㄹㅏ" """
+    out = []
+    for ch in text.lower():
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            index = code - _HANGUL_BASE
+            parts = (_CHOSEONG[index // 588], _JUNGSEONG[(index % 588) // 28], _JONGSEONG[index % 28])
+            for part in parts:
+                out.append(_COMPOUND_JAMO.get(part, part))
+        elif not ch.isspace():
+            out.append(_COMPOUND_JAMO.get(ch, ch))
+    return "".join(out)
+
+
+def choseong(text: str) -> str:
+    """Initial consonants of each syllable, e.g. "바닐라" -> "ㅂㄴㄹ" """
+    out = []
+    for ch in text.lower():
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            out.append(_CHOSEONG[(code - _HANGUL_BASE) // 588])
+        elif not ch.isspace():
+            out.append(ch)
+    return "".join(out)
+
+
+def is_choseong_query(text: str) -> bool:
+    stripped = "".join(text.split())
+    return bool(stripped) and all(ch in _CHOSEONG for ch in stripped)
+
+
+# ========== 접두어 인덱스 ==========
+
+class _ScopeIndex:
+    """Sorted (key, entry id) lists for one scope; lookups are bisect + scan"""
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+        self.by_term: Dict[str, int] = {}
+        self.jamo_keys: List[Tuple[str, int]] = []
+        self.choseong_keys: List[Tuple[str, int]] = []
+
+    def add(self, term: str, icon_key: Optional[str], source_type: str):
+        if term in self.by_term:
+            return
+        entry_id = len(self.entries)
+        self.entries.append({"term": term, "icon_key": icon_key, "source_type": source_type})
+        self.by_term[term] = entry_id
+        # 단어 시작마다 키를 만들어 "초콜" -> "다크 초콜릿"도 찾도록 함
+        words = term.split()
+        for i in range(len(words)):
+            rest = " ".join(words[i:])
+            insort(self.jamo_keys, (decompose_jamo(rest), entry_id))
+            insort(self.choseong_keys, (choseong(rest), entry_id))
+
+    @staticmethod
+    def _scan(keys: List[Tuple[str, int]], prefix: str) -> Iterable[int]:
+        i = bisect_left(keys, (prefix,))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            yield keys[i][1]
+            i += 1
+
+    def match(self, query: str) -> set:
+        matched = set(self._scan(self.jamo_keys, decompose_jamo(query)))
+        if is_choseong_query(query):
+            matched.update(self._scan(self.choseong_keys, "".join(query.split())))
+        return matched
+
+
+class KeywordSuggestService:
+    """키워드 자동완성 (음절 / 자모 / 초성 접두어 매칭, 사용 빈도순)"""
+
+    _indexes: Optional[Dict[str, _ScopeIndex]] = None
+    _usage: Dict[Tuple[str, str], int] = {}
+    _built_at: float = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _ensure_index(cls, db: Session) -> Dict[str, _ScopeIndex]:
+        indexes = cls._indexes
+        if indexes is not None and time.monotonic() - cls._built_at < CACHE_TTL_SECONDS:
+            return indexes
+        with cls._lock:
+            if cls._indexes is None or time.monotonic() - cls._built_at >= CACHE_TTL_SECONDS:
+                indexes = {}
+                vocab = db.query(VocabularyTerm.scope, VocabularyTerm.term, VocabularyTerm.icon_key).order_by(
+                    VocabularyTerm.level
+                ).all()
+                for scope, term, icon_key in vocab:
+                    indexes.setdefault(scope, _ScopeIndex()).add(term, icon_key, "vocabulary")
+                for scope, term, icon_key in db.query(UserTerm.scope, UserTerm.term, UserTerm.icon_key).all():
+                    indexes.setdefault(scope, _ScopeIndex()).add(term, icon_key, "user")
+
+                counts = db.query(NoteKeyword.term_id, func.count().label("count")).group_by(
+                    NoteKeyword.term_id
+                ).subquery()
+                usage = db.query(KeywordTerm.scope, KeywordTerm.term, counts.c.count).join(
+                    counts, counts.c.term_id == KeywordTerm.id
+                ).all()
+                cls._usage = {(scope, term): count for scope, term, count in usage}
+                cls._indexes = indexes
+                cls._built_at = time.monotonic()
+            return cls._indexes
+
+    @classmethod
+    def suggest(cls, db: Session, scope: str, query: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """Top terms in a scope whose syllables, jamo or initials start with the query"""
+        query = (query or "").strip()
+        if not query:
+            return []
+        index = cls._ensure_index(db).get(scope)
+        if index is None:
+            return []
+        usage = cls._usage
+        ranked = sorted(
+            index.match(query),
+            key=lambda i: (-usage.get((scope, index.entries[i]["term"]), 0), index.entries[i]["term"]),
+        )
+        return [
+            dict(index.entries[i], count=usage.get((scope, index.entries[i]["term"]), 0))
+            for i in ranked[offset:offset + limit]
+        ]
+
+    @classmethod
+    def add_term(cls, scope: str, term: str, icon_key: Optional[str] = None, source_type: str = "user"):
+        """Add a newly created term to a built index (no-op on a cold index)"""
+        with cls._lock:
+            if cls._indexes is not None:
+                cls._indexes.setdefault(scope, _ScopeIndex()).add(term, icon_key, source_type)
+
+    @classmethod
+    def apply_usage_delta(cls, removed: Iterable[Tuple[str, str]] = (), added: Iterable[Tuple[str, str]] = ()):
+        """Adjust usage counts by (scope, term) pairs removed from / added to notes"""
+        with cls._lock:
+            if cls._indexes is None:
+                return
+            usage = cls._usage
+            for key in removed:
+                usage[key] = max(usage.get(key, 0) - 1, 0)
+            for key in added:
+                usage[key] = usage.get(key, 0) + 1
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._indexes = None
@@ -0,0 +1,154 @@
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import event, inspect, select, text, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models import KeywordTerm, NoteKeyword, UserTerm, VocabularyTerm
+
+logger = logging.getLogger(__name__)
+
+
+# SQLite 바인드 변수 제한을 넘지 않도록 (scope, term) IN 조회를 나눔
+_LOOKUP_CHUNK = 400
+
+
+class TermDictionary:
+    """(scope, term) <-> integer id interning backed by keyword_terms
+
+    Every keyword a note uses, every vocabulary term and every custom term
+    gets one row; note_keywords.term_id points at it and the term text and
+    icon are stored only here. Ids are never reused
+    or deleted, so committed ids are cached for the life of the process.
+    Ids a session inserts stay in that session's pending map until it
+    commits (then they are cached) or rolls back (then they are dropped).
+    """
+
+    _ids: Dict[Tuple[str, str], int] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def lookup(cls, db: Session, scope: str, term: str) -> Optional[int]:
+        key = (scope, term)
+        term_id = cls._ids.get(key) or db.info.get("new_terms", {}).get(key)
+        if term_id is None:
+            term_id = cls._select(db, [key]).get(key)
+        return term_id
+
+    @classmethod
+    def intern(cls, db: Session, keywords: Iterable[Tuple[str, str, Optional[str]]]) -> Dict[Tuple[str, str], int]:
+        """Ids for (scope, term, icon_key) entries, creating missing terms"""
+        icons: Dict[Tuple[str, str], Optional[str]] = {}
+        for scope, term, icon_key in keywords:
+            icons.setdefault((scope, term), icon_key)
+        pending = db.info.get("new_terms", {})
+        ids = {}
+        for key in icons:
+            term_id = cls._ids.get(key) or pending.get(key)
+            if term_id is not None:
+                ids[key] = term_id
+        missing = [key for key in icons if key not in ids]
+        if missing:
+            ids.update(cls._select(db, missing))
+        new = [key for key in missing if key not in ids]
+        if new:
+            db.execute(
+                sqlite_insert(KeywordTerm.__table__).on_conflict_do_nothing(),
+                [{"scope": scope, "term": term, "icon_key": icons[(scope, term)]} for scope, term in new],
+            )
+            found = cls._select(db, new, cache=False)
+            db.info.setdefault("new_terms", {}).update(found)
+            ids.update(found)
+        return ids
+
+    @classmethod
+    def _select(cls, db: Session, keys, cache: bool = True) -> Dict[Tuple[str, str], int]:
+        found: Dict[Tuple[str, str], int] = {}
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start:start + _LOOKUP_CHUNK]
+            rows = db.execute(
+                select(KeywordTerm.id, KeywordTerm.scope, KeywordTerm.term).where(
+                    tuple_(KeywordTerm.scope, KeywordTerm.term).in_(chunk)
+                )
+            )
+            for term_id, scope, term in rows:
+                found[(scope, term)] = term_id
+        # 이 세션이 아직 커밋하지 않은 키워드는 캐시하지 않음
+        pending = db.info.get("new_terms", {})
+        cacheable = {key: term_id for key, term_id in found.items() if key not in pending}
+        if cache and cacheable:
+            with cls._lock:
+                cls._ids.update(cacheable)
+        return found
+
+    @classmethod
+    def _committed(cls, session: Session):
+        pending = session.info.pop("new_terms", None)
+        if pending:
+            with cls._lock:
+                cls._ids.update(pending)
+
+    @staticmethod
+    def _rolled_back(session: Session):
+        session.info.pop("new_terms", None)
+
+    @staticmethod
+    def migrate_note_keywords(bind) -> int:
+        """Rebuild note_keywords of databases that still store term / icon_key on every row
+
+        Interns every used (scope, term), then copies the rows into the
+        current schema (term_id NOT NULL, no term / icon_key) in one
+        transaction. The icon moves to the keyword_terms row: the
+        vocabulary icon if there is one, otherwise the rows' icon.
+        """
+        columns = {column["name"] for column in inspect(bind).get_columns("note_keywords")}
+        if "term" not in columns:
+            return 0
+        table = NoteKeyword.__table__
+        with bind.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO keyword_terms (scope, term, icon_key) "
+                "SELECT n.scope, n.term, COALESCE(("
+                "SELECT v.icon_key FROM vocabulary_terms v WHERE v.scope = n.scope AND v.term = n.term "
+                "AND v.icon_key IS NOT NULL ORDER BY v.level LIMIT 1"
+                "), MIN(n.icon_key)) FROM note_keywords n WHERE true GROUP BY n.scope, n.term "
+                "ON CONFLICT (scope, term) DO UPDATE SET icon_key = COALESCE(keyword_terms.icon_key, excluded.icon_key)"
+            ))
+            # 인덱스 이름은 DB 전체에서 unique하므로 새 테이블을 만들기 전에 지움
+            old_indexes = conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'note_keywords' AND sql IS NOT NULL"
+            )).scalars().all()
+            for name in old_indexes:
+                conn.execute(text(f'DROP INDEX "{name}"'))
+            conn.execute(text("ALTER TABLE note_keywords RENAME TO note_keywords_old"))
+            table.create(conn)
+            copied = conn.execute(text(
+                "INSERT INTO note_keywords (id, note_id, scope, term_id, detail_text, position, source_type) "
+                "SELECT o.id, o.note_id, o.scope, k.id, o.detail_text, o.position, o.source_type "
+                "FROM note_keywords_old o JOIN keyword_terms k ON k.scope = o.scope AND k.term = o.term "
+                "ORDER BY o.id"
+            )).rowcount
+            conn.execute(text("DROP TABLE note_keywords_old"))
+        logger.info("Moved %d note keywords to term ids (run VACUUM to shrink the file)", copied)
+        return copied
+
+    @classmethod
+    def backfill(cls, bind) -> int:
+        """Intern vocabulary and custom terms that keyword_terms does not know yet"""
+        with Session(bind=bind) as db:
+            unknown_vocabulary = db.execute(text(
+                "SELECT COUNT(*) FROM vocabulary_terms v LEFT JOIN keyword_terms k "
+                "ON k.scope = v.scope AND k.term = v.term WHERE k.id IS NULL"
+            )).scalar()
+            if not unknown_vocabulary:
+                return 0
+
+            keywords = [tuple(row) for row in db.query(VocabularyTerm.scope, VocabularyTerm.term, VocabularyTerm.icon_key)]
+            keywords += [tuple(row) for row in db.query(UserTerm.scope, UserTerm.term, UserTerm.icon_key)]
+            ids = cls.intern(db, keywords)
+            db.commit()
+            return len(ids)
+
+
+event.listen(Session, "after_commit", TermDictionary._committed)
+event.listen(Session, "after_rollback", TermDictionary._rolled_back)
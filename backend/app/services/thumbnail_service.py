@@ -0,0 +1,170 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.services.image_store import UPLOADS_DIR
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow가 없으면 원본 이미지만 사용
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+# 파생 이미지 (이름, 최대 가로 px) / 포맷 (확장자, Pillow 포맷, 저장 옵션)
+VARIANTS: Tuple[Tuple[str, int], ...] = (("thumb", 320), ("medium", 960))
+FORMATS: Tuple[Tuple[str, str, dict], ...] = (
+    ("webp", "WEBP", {"quality": 80, "method": 4}),
+    ("jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+)
+
+THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", "2"))
+
+# 서버 프로세스는 스레드를 쓰므로 fork 대신 spawn으로 워커 생성
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def variant_path(image_path: str, variant: str, ext: str) -> str:
+    """"ab/abcd.jpg" -> "ab/abcd.thumb.webp" (stored next to the original)"""
+    return f"{os.path.splitext(image_path)[0]}.{variant}.{ext}"
+
+
+def derivative_paths(image_path: str) -> List[str]:
+    return [variant_path(image_path, variant, ext) for variant, _ in VARIANTS for ext, _, _ in FORMATS]
+
+
+def render_derivatives(uploads_dir: str, image_path: str, force: bool = False) -> int:
+    """Decode one original and write every missing variant; returns files written
+
+    Runs inside the process pool, so it only takes picklable arguments.
+    """
+    source = os.path.join(uploads_dir, image_path)
+    targets = [
+        (variant, width, ext, fmt, options, os.path.join(uploads_dir, variant_path(image_path, variant, ext)))
+        for variant, width in VARIANTS
+        for ext, fmt, options in FORMATS
+    ]
+    if not force and all(os.path.exists(t[-1]) for t in targets):
+        return 0
+
+    written = 0
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        for variant, width, ext, fmt, options, target in targets:
+            if not force and os.path.exists(target):
+                continue
+            resized = image.copy()
+            # 가로 기준으로 줄이고 원본보다 크게 만들지 않음
+            resized.thumbnail((width, width * 4), Image.LANCZOS)
+            # 같은 원본을 다른 프로세스가 동시에 그려도 섞이지 않도록 쓰기마다 고유한 임시 파일
+            fd, tmp = tempfile.mkstemp(prefix=".thumb-", suffix=f".{ext}", dir=os.path.dirname(target))
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    resized.save(out, fmt, **options)
+                os.replace(tmp, target)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            written += 1
+    return written
+
+
+class ThumbnailService:
+    """업로드 이미지의 썸네일 / 중간 크기 파생 이미지 생성 (프로세스 풀)"""
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _ready: Dict[str, bool] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return Image is not None
+
+    @classmethod
+    def _pool(cls) -> ProcessPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(max_workers=THUMBNAIL_WORKERS, mp_context=_MP_CONTEXT)
+            return cls._executor
+
+    @classmethod
+    def schedule(cls, image_path: Optional[str]) -> Optional[Future]:
+        """Queue derivative rendering for a stored upload without waiting for it"""
+        if not image_path or not cls.available():
+            return None
+        future = cls._pool().submit(render_derivatives, UPLOADS_DIR, image_path)
+        future.add_done_callback(lambda f: cls._log_failure(image_path, f))
+        return future
+
+    @staticmethod
+    def _log_failure(image_path: str, future: Future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.warning("Thumbnail generation failed for %s: %s", image_path, error)
+
+    @classmethod
+    def backfill(cls, image_paths: Iterable[str], force: bool = False, workers: int = THUMBNAIL_WORKERS):
+        """Render derivatives for existing images; yields (image_path, written or exception)"""
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT) as pool:
+            futures = {
+                pool.submit(render_derivatives, UPLOADS_DIR, path, force): path
+                for path in image_paths
+            }
+            for future, path in futures.items():
+                try:
+                    yield path, future.result()
+                except Exception as e:
+                    yield path, e
+
+    @classmethod
+    def sources(cls, image_path: Optional[str]) -> Dict[str, str]:
+        """src / srcset values for templates; srcset is empty until derivatives exist"""
+        if not image_path:
+            return {"src": "", "webp_srcset": "", "jpeg_srcset": ""}
+        sources = {"src": f"/uploads/{image_path}", "webp_srcset": "", "jpeg_srcset": ""}
+        if not cls._has_derivatives(image_path):
+            return sources
+        for ext, key in (("webp", "webp_srcset"), ("jpg", "jpeg_srcset")):
+            sources[key] = ", ".join(
+                f"/uploads/{variant_path(image_path, variant, ext)} {width}w" for variant, width in VARIANTS
+            )
+        # srcset을 모르는 브라우저도 원본 대신 중간 크기를 받도록
+        sources["src"] = f"/uploads/{variant_path(image_path, VARIANTS[-1][0], 'jpg')}"
+        return sources
+
+    @classmethod
+    def _has_derivatives(cls, image_path: str) -> bool:
+        # 생성된 뒤에는 바뀌지 않으므로 확인된 경로만 기억 (없으면 다음 요청에서 다시 확인)
+        if cls._ready.get(image_path):
+            return True
+        ready = all(os.path.exists(os.path.join(UPLOADS_DIR, p)) for p in derivative_paths(image_path))
+        if ready:
+            cls._ready[image_path] = True
+        return ready
+
+    @classmethod
+    def forget(cls, image_path: Optional[str]):
+        """Drop derivatives of a deleted original"""
+        if not image_path:
+            return
+        cls._ready.pop(image_path, None)
+        for path in derivative_paths(image_path):
+            try:
+                os.remove(os.path.join(UPLOADS_DIR, path))
+            except OSError:
+                pass
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
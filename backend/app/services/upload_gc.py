@@ -0,0 +1,277 @@
+import logging
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from app.models import Note
+from app.services.image_store import BASE_DIR, UPLOADS_DIR
+from app.services.thumbnail_service import VARIANTS
+
+try:
+    import fcntl
+except ImportError:  # Windows에는 fcntl이 없으므로 msvcrt로 잠금
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+# 참조되지 않는 파일은 바로 지우지 않고 격리 폴더로 옮긴 뒤, 유예 기간이 지나면 삭제
+# (/uploads로 서빙되지 않도록 uploads 바깥, 같은 파일시스템에 둠)
+QUARANTINE_DIR = os.environ.get(
+    "TASTING_NOTES_QUARANTINE_DIR", os.path.join(BASE_DIR, "app", "uploads_quarantine")
+)
+UPLOAD_GC_GRACE_SECONDS = int(float(os.environ.get("UPLOAD_GC_GRACE_HOURS", "24")) * 3600)
+# 서버 내 주기 실행 간격 (0이면 끔)
+UPLOAD_GC_INTERVAL_SECONDS = int(float(os.environ.get("UPLOAD_GC_INTERVAL_HOURS", "24")) * 3600)
+
+_SHARD_RE = re.compile(r"^[0-9a-f]{2}$")
+_VARIANT_NAMES = {variant for variant, _ in VARIANTS}
+# 워커마다 GC 루프가 돌므로 한 번에 한 프로세스만 실행하도록 격리 폴더의 잠금 파일 사용
+_LOCK_FILE = ".gc.lock"
+_KEEP_FILES = {".gitkeep", _LOCK_FILE}
+
+
+class GCResult(NamedTuple):
+    scanned: int
+    kept: int
+    quarantined: int
+    quarantined_bytes: int
+    restored: int
+    deleted: int
+    reclaimed_bytes: int
+
+
+def _iter_files(directory: str) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Yield (relative path, entry) for files in the top level and the sha shard folders"""
+    try:
+        top = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with top:
+        for entry in top:
+            if entry.is_file(follow_symlinks=False):
+                yield entry.name, entry
+            elif entry.is_dir(follow_symlinks=False) and _SHARD_RE.match(entry.name):
+                with os.scandir(entry.path) as shard:
+                    for child in shard:
+                        if child.is_file(follow_symlinks=False):
+                            yield f"{entry.name}/{child.name}", child
+
+
+def _derivative_stem(relative: str) -> Optional[str]:
+    """Original path without extension for derivatives, None otherwise
+
+    Mirrors thumbnail_service.variant_path (splitext of the original), so
+    dotted legacy names work: "20240101_120000_my.photo.thumb.webp" ->
+    "20240101_120000_my.photo"; "ab/abcd.thumb.webp" -> "ab/abcd".
+    """
+    parts = relative.rsplit(".", 2)
+    if len(parts) != 3 or parts[1] not in _VARIANT_NAMES or "/" in parts[2]:
+        return None
+    stem = parts[0]
+    if not stem or stem.endswith("/"):
+        return None
+    return stem
+
+
+def _move(source: str, target: str):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.replace(source, target)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # 다른 파일시스템이면 복사 후 삭제
+        shutil.move(source, target)
+
+
+@contextmanager
+def _exclusive_run(quarantine_dir: str) -> Iterator[bool]:
+    """Non-blocking exclusive lock on the quarantine folder's lock file; yields False if another process holds it"""
+    os.makedirs(quarantine_dir, exist_ok=True)
+    with open(os.path.join(quarantine_dir, _LOCK_FILE), "a+b") as handle:
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            # flock은 파일을 닫으면 풀리지만 msvcrt는 명시적으로 해제
+            if fcntl is None:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class UploadGC:
+    """Removes files in UPLOADS_DIR that no note references
+
+    Each run (1) deletes quarantined files older than the grace period,
+    restoring any that became referenced again, then (2) moves unreferenced
+    files older than the grace period into QUARANTINE_DIR. A file is
+    therefore deleted no sooner than two grace periods after it was last
+    written, which covers uploads whose note has not been committed yet.
+    Derivatives (<stem>.<variant>.<ext>, see variant_path) follow their original.
+    Runs take a lock in QUARANTINE_DIR, so only one process collects at a time.
+    """
+
+    @staticmethod
+    def referenced_paths(db: Session) -> Set[str]:
+        rows = db.query(Note.image_path).filter(Note.image_path.isnot(None)).distinct()
+        return {path for (path,) in rows.yield_per(1000)}
+
+    @staticmethod
+    def is_referenced(relative: str, referenced: Set[str], referenced_stems: Set[str]) -> bool:
+        if relative in referenced:
+            return True
+        stem = _derivative_stem(relative)
+        return stem is not None and stem in referenced_stems
+
+    @staticmethod
+    def run(
+        db: Session,
+        grace_seconds: int = UPLOAD_GC_GRACE_SECONDS,
+        dry_run: bool = False,
+        uploads_dir: str = UPLOADS_DIR,
+        quarantine_dir: str = QUARANTINE_DIR,
+    ) -> Optional[GCResult]:
+        """Collect unreferenced uploads; None if another process is already running (dry runs take no lock)"""
+        if dry_run:
+            return UploadGC._collect(db, grace_seconds, dry_run, uploads_dir, quarantine_dir)
+        with _exclusive_run(quarantine_dir) as acquired:
+            if not acquired:
+                logger.info("Upload GC skipped: another process is running it")
+                return None
+            return UploadGC._collect(db, grace_seconds, dry_run, uploads_dir, quarantine_dir)
+
+    @staticmethod
+    def _collect(
+        db: Session,
+        grace_seconds: int,
+        dry_run: bool,
+        uploads_dir: str,
+        quarantine_dir: str,
+    ) -> GCResult:
+        referenced = UploadGC.referenced_paths(db)
+        referenced_stems = {os.path.splitext(path)[0] for path in referenced}
+        cutoff = time.time() - grace_seconds
+
+        restored, deleted, reclaimed = UploadGC._purge_quarantine(
+            referenced, referenced_stems, cutoff, dry_run, uploads_dir, quarantine_dir
+        )
+
+        scanned = kept = quarantined = quarantined_bytes = 0
+        for relative, entry in _iter_files(uploads_dir):
+            scanned += 1
+            if entry.name in _KEEP_FILES or UploadGC.is_referenced(relative, referenced, referenced_stems):
+                kept += 1
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            # 업로드 / 썸네일 작성 중인 임시 파일(.upload-*, .thumb-*)이나 아직 커밋되지 않은 노트의 이미지는 유예 기간 동안 보존
+            if stat.st_mtime > cutoff:
+                kept += 1
+                continue
+            if not dry_run:
+                target = os.path.join(quarantine_dir, relative)
+                try:
+                    _move(entry.path, target)
+                    # 격리 시각부터 유예 기간을 다시 계산
+                    os.utime(target)
+                except FileNotFoundError:
+                    continue  # 그사이 다른 실행이 이미 옮김
+                except OSError as e:
+                    logger.warning("Could not quarantine %s: %s", relative, e)
+                    continue
+            quarantined += 1
+            quarantined_bytes += stat.st_size
+
+        return GCResult(
+            scanned=scanned,
+            kept=kept,
+            quarantined=quarantined,
+            quarantined_bytes=quarantined_bytes,
+            restored=restored,
+            deleted=deleted,
+            reclaimed_bytes=reclaimed,
+        )
+
+    @staticmethod
+    def _purge_quarantine(
+        referenced: Set[str],
+        referenced_stems: Set[str],
+        cutoff: float,
+        dry_run: bool,
+        uploads_dir: str,
+        quarantine_dir: str,
+    ) -> Tuple[int, int, int]:
+        """(restored, deleted, reclaimed bytes) for the quarantine folder"""
+        restored = deleted = reclaimed = 0
+        for relative, entry in _iter_files(quarantine_dir):
+            if entry.name in _KEEP_FILES:
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if UploadGC.is_referenced(relative, referenced, referenced_stems):
+                # 격리 후 같은 사진이 다시 쓰이게 된 경우 (중복 업로드) 되돌림
+                target = os.path.join(uploads_dir, relative)
+                if not dry_run:
+                    try:
+                        if os.path.exists(target):
+                            os.remove(entry.path)
+                        else:
+                            _move(entry.path, target)
+                    except FileNotFoundError:
+                        continue  # 다른 실행이 이미 처리함
+                    except OSError as e:
+                        logger.warning("Could not restore %s: %s", relative, e)
+                        continue
+                restored += 1
+                continue
+            if stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue  # 다른 실행이 이미 처리함
+                except OSError as e:
+                    logger.warning("Could not delete %s: %s", relative, e)
+                    continue
+            deleted += 1
+            reclaimed += stat.st_size
+        return restored, deleted, reclaimed
+
+    @staticmethod
+    def run_with_session(grace_seconds: int = UPLOAD_GC_GRACE_SECONDS) -> Optional[GCResult]:
+        """Scheduled entry point: own session, failures are logged instead of raised"""
+        db = SessionLocal()
+        try:
+            result = UploadGC.run(db, grace_seconds=grace_seconds)
+        except Exception:
+            logger.exception("Upload GC failed")
+            return None
+        finally:
+            db.close()
+        if result is None:
+            return None
+        if result.quarantined or result.deleted or result.restored:
+            logger.info(
+                "Upload GC: %d quarantined (%d bytes), %d restored, %d deleted (%d bytes reclaimed)",
+                result.quarantined, result.quarantined_bytes, result.restored, result.deleted, result.reclaimed_bytes,
+            )
+        return result
@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Any, NamedTuple, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models import VocabularyTerm, UserTerm
+
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 의존성 (없으면 gzip만 제공)
+    brotli = None
+
+
+SCOPES = ("nose", "palate", "finish")
+
+# 다른 워커 프로세스에서 추가된 커스텀 키워드를 늦게라도 반영하기 위한 최대 보관 시간
+CACHE_TTL_SECONDS = 300
+
+# 작성 화면에 처음부터 보여 줄 커스텀 키워드 수 (scope별, 사용 빈도순)
+USER_TERMS_PER_SCOPE = 30
+
+
+class VocabularySnapshot(NamedTuple):
+    """Vocabulary hierarchy for every scope, built at one point in time
+
+    The nested dicts are shared by every request and must be treated as
+    read-only; build a new snapshot instead of mutating one.
+    """
+    built_at: float
+    scopes: Dict[str, Dict[str, Any]]
+    # /api/vocabulary 응답 (compact JSON + 미리 압축한 본문)
+    version: str
+    payload: bytes
+    payload_gzip: bytes
+    payload_br: Optional[bytes]
+
+    def scope(self, scope: str) -> Dict[str, Any]:
+        return self.scopes.get(scope) or _empty_scope()
+
+
+def _empty_scope() -> Dict[str, Any]:
+    return {"hierarchy": {}, "user_terms": [], "user_terms_total": 0, "categories": {}, "subcategories": {}}
+
+
+def _build_snapshot(db: Session) -> VocabularySnapshot:
+    """Load all scopes with two queries and organize them into the form hierarchy"""
+    scopes = {scope: _empty_scope() for scope in SCOPES}
+
+    vocab = db.query(VocabularyTerm).order_by(
+        VocabularyTerm.scope,
+        VocabularyTerm.level,
+        VocabularyTerm.category,
+        VocabularyTerm.subcategory,
+    ).all()
+    for term in vocab:
+        data = scopes.setdefault(term.scope, _empty_scope())
+        hierarchy = data["hierarchy"]
+        cat = term.category or "기타"
+        subcat = term.subcategory or "일반"
+
+        # Store category (level 1)
+        if term.level == 1:
+            data["categories"][cat] = {"term": term.term, "icon_key": term.icon_key}
+
+        # Store subcategory (level 2)
+        if term.level == 2:
+            data["subcategories"].setdefault(cat, {})[subcat] = {
+                "term": term.term,
+                "icon_key": term.icon_key,
+            }
+
+        # Organize detail keywords (level 3)
+        subcat_terms = hierarchy.setdefault(cat, {}).setdefault(subcat, [])
+        if term.level == 3:
+            subcat_terms.append({"term": term.term, "icon_key": term.icon_key})
+
+    # 커스텀 키워드는 scope별 사용 빈도 상위만 (나머지는 /api/keywords/custom에서 페이지 단위로)
+    rank = func.row_number().over(
+        partition_by=UserTerm.scope, order_by=(UserTerm.usage_count.desc(), UserTerm.id)
+    ).label("rank")
+    total = func.count().over(partition_by=UserTerm.scope).label("total")
+    ranked = select(
+        UserTerm.id, UserTerm.scope, UserTerm.term, UserTerm.icon_key, UserTerm.usage_count, rank, total
+    ).subquery()
+    top_user_terms = db.execute(
+        select(ranked).where(ranked.c.rank <= USER_TERMS_PER_SCOPE).order_by(ranked.c.scope, ranked.c.rank)
+    )
+    for term_id, scope, term, icon_key, usage_count, _, total_count in top_user_terms:
+        data = scopes.setdefault(scope, _empty_scope())
+        data["user_terms"].append({"id": term_id, "term": term, "icon_key": icon_key, "count": usage_count})
+        data["user_terms_total"] = total_count
+
+    payload = json.dumps(
+        {"scopes": scopes}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    return VocabularySnapshot(
+        built_at=time.monotonic(),
+        scopes=scopes,
+        version=hashlib.sha256(payload).hexdigest()[:16],
+        payload=payload,
+        payload_gzip=gzip.compress(payload, compresslevel=9, mtime=0),
+        payload_br=brotli.compress(payload) if brotli else None,
+    )
+
+
+class VocabularyCache:
+    """프로세스 단위로 공유되는 키워드 계층 구조 캐시"""
+
+    _snapshot: Optional[VocabularySnapshot] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, db: Session) -> VocabularySnapshot:
+        """Return the current snapshot, building it on a cold or expired cache"""
+        snapshot = cls._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.built_at < CACHE_TTL_SECONDS:
+            return snapshot
+        with cls._lock:
+            snapshot = cls._snapshot
+            if snapshot is None or time.monotonic() - snapshot.built_at >= CACHE_TTL_SECONDS:
+                snapshot = _build_snapshot(db)
+                cls._snapshot = snapshot
+            return snapshot
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the snapshot; the next request rebuilds it"""
+        with cls._lock:
+            cls._snapshot = None
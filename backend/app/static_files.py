@@ -0,0 +1,293 @@
+"""
+HTTP caching layer for /static and /uploads
+
+StaticFiles subclass that adds
+- Cache-Control: immutable for content-addressed uploads and fingerprinted
+  static builds, revalidation (strong ETag) for everything else
+- If-None-Match / If-Modified-Since -> 304
+- single Range requests (206 / 416), with If-Range
+- precompressed .br / .gz siblings for text assets when the client accepts them
+"""
+import json
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# 미리 압축한 파일을 찾을 텍스트 자원
+PRECOMPRESSED_EXTENSIONS = (".css", ".js", ".svg", ".json", ".txt", ".html")
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# uploads/<sha[:2]>/<sha256>[.variant].ext
+CONTENT_ADDRESSED_RE = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)*$")
+# static/dist/<name>.<hash12>.<ext> (build_static.py 결과)
+FINGERPRINTED_RE = re.compile(r"^dist/.+\.[0-9a-f]{12}\.[A-Za-z0-9]+$")
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# If-None-Match 목록의 항목: W/"..." / "..." / *
+_ENTITY_TAG_RE = re.compile(r'\s*(?:(?:W/)?"([^"]*)"|(\*))\s*(?:,|$)')
+
+
+def _quality(params: str) -> float:
+    for param in params.split(";"):
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0  # 잘못된 q 값은 받지 않는 것으로 취급
+    return 1.0
+
+
+def accepted_encodings(request_headers: Headers) -> set:
+    """Content codings named in Accept-Encoding (exact tokens, lowercased), except those with q=0"""
+    accepted = set()
+    for part in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if name and _quality(params) > 0:
+            accepted.add(name)
+    return accepted
+
+
+def _opaque_tag(etag: str) -> str:
+    tag = etag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return tag[1:-1] if len(tag) >= 2 and tag[0] == tag[-1] == '"' else tag
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match check: weak comparison of each listed entity tag with etag, "*" matches all
+
+    Malformed entries never match, so the full response is sent.
+    """
+    target = _opaque_tag(etag)
+    position, header = 0, header or ""
+    while position < len(header.rstrip()):
+        match = _ENTITY_TAG_RE.match(header, position)
+        if match is None or match.end() == position:
+            return False
+        opaque, star = match.groups()
+        if star or opaque == target:
+            return True
+        position = match.end()
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single satisfiable range, None if unsatisfiable
+
+    Raises ValueError for ranges we do not handle (multiple ranges, other units);
+    callers then serve the whole file, which RFC 9110 allows.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        raise ValueError(header)
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(header)
+    if not first:
+        # 마지막 N 바이트
+        length = int(last)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(Response):
+    """206 response streaming bytes [start, end] of a file"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, end: int, size: int, headers: Dict[str, str], media_type: str, method: str):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.status_code = 206
+        self.media_type = media_type
+        self.background = None
+        self.send_header_only = method.upper() == "HEAD"
+        self.init_headers(headers)
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class CachedStaticFiles(StaticFiles):
+    def __init__(
+        self,
+        *,
+        directory: str,
+        immutable: Callable[[str], bool] = lambda path: False,
+        cache_control: str = REVALIDATE,
+        **kwargs,
+    ):
+        super().__init__(directory=directory, **kwargs)
+        self.immutable = immutable
+        self.cache_control = cache_control
+
+    def _relative(self, full_path) -> str:
+        return os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+
+    def _precompressed(self, full_path: str, request_headers: Headers):
+        """(path, stat, encoding) of the best precompressed sibling, or None"""
+        if not str(full_path).endswith(PRECOMPRESSED_EXTENSIONS):
+            return None
+        accepted = accepted_encodings(request_headers)
+        for encoding, suffix in _ENCODINGS:
+            if encoding in accepted:
+                try:
+                    sibling_stat = os.stat(f"{full_path}{suffix}")
+                except OSError:
+                    continue
+                return f"{full_path}{suffix}", sibling_stat, encoding
+        return None
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        if status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        method = scope["method"]
+        request_headers = Headers(scope=scope)
+        relative = self._relative(full_path)
+        immutable = self.immutable(relative)
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+
+        send_path, send_stat, encoding = str(full_path), stat_result, None
+        compressed = self._precompressed(send_path, request_headers)
+        if compressed:
+            send_path, send_stat, encoding = compressed
+
+        # 강한 ETag: 내용 해시가 이름에 있으면 그 값, 아니면 보내는 파일의 mtime/크기
+        if immutable:
+            tag = os.path.basename(relative)
+        else:
+            tag = f"{send_stat.st_mtime_ns:x}-{send_stat.st_size:x}"
+        if encoding:
+            tag = f"{tag}-{encoding}"
+        etag = f'"{tag}"'
+
+        headers = {
+            "cache-control": IMMUTABLE if immutable else self.cache_control,
+            "etag": etag,
+            "last-modified": formatdate(send_stat.st_mtime, usegmt=True),
+        }
+        if str(full_path).endswith(PRECOMPRESSED_EXTENSIONS):
+            headers["vary"] = "Accept-Encoding"
+        if encoding:
+            headers["content-encoding"] = encoding
+        else:
+            headers["accept-ranges"] = "bytes"
+
+        if self._not_modified(request_headers, etag, send_stat):
+            return NotModifiedResponse(Headers(headers))
+
+        range_header = request_headers.get("range")
+        if range_header and not encoding and method in ("GET", "HEAD") and self._if_range_ok(request_headers, etag, send_stat):
+            size = send_stat.st_size
+            try:
+                byte_range = _parse_range(range_header, size)
+            except ValueError:
+                byte_range = False  # 처리하지 않는 형식은 전체 파일로 응답
+            if byte_range is None:
+                return Response(
+                    status_code=416,
+                    headers={"content-range": f"bytes */{size}", "cache-control": headers["cache-control"]},
+                )
+            if byte_range:
+                start, end = byte_range
+                return FileRangeResponse(send_path, start, end, size, headers, media_type, method)
+
+        return FileResponse(
+            send_path,
+            headers=headers,
+            media_type=media_type,
+            stat_result=send_stat,
+            method=method,
+        )
+
+    @staticmethod
+    def _not_modified(request_headers: Headers, etag: str, stat_result: os.stat_result) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        since = request_headers.get("if-modified-since")
+        if since:
+            try:
+                return int(stat_result.st_mtime) <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _if_range_ok(request_headers: Headers, etag: str, stat_result: os.stat_result) -> bool:
+        if_range = request_headers.get("if-range")
+        if not if_range:
+            return True
+        if if_range.startswith('"'):
+            return if_range == etag
+        try:
+            return int(stat_result.st_mtime) <= parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+
+# ========== 지문(fingerprint) 파일 매니페스트 ==========
+
+class StaticManifest:
+    """Maps source names in app/static to fingerprinted builds (static/dist/manifest.json)"""
+
+    def __init__(self, static_dir: str, url_prefix: str = "/static"):
+        self.path = os.path.join(static_dir, "dist", "manifest.json")
+        self.url_prefix = url_prefix
+        self._entries: Dict[str, str] = {}
+        self._mtime: Optional[float] = None
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            self._entries, self._mtime = {}, None
+            return
+        if mtime != self._mtime:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+            self._mtime = mtime
+
+    def url(self, name: str) -> str:
+        """URL for a static file: the fingerprinted build when it exists, else the source"""
+        self._load()
+        built = self._entries.get(name)
+        if built:
+            return f"{self.url_prefix}/dist/{built}"
+        return f"{self.url_prefix}/{name}"
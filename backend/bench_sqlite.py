@@ -0,0 +1,127 @@
+"""
+SQLite 연결 프로파일 동시성 벤치마크 (기본 설정 vs WAL 튜닝 프로파일)
+Run: python backend/bench_sqlite.py [--threads 8] [--seconds 5] [--write-ratio 0.2]
+
+임시 DB 파일에 노트를 채운 뒤 여러 스레드가 게시판 조회(읽기)와 노트 작성(쓰기)을
+섞어 실행하고, 프로파일별 처리량과 잠금 오류 수를 비교합니다.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from tabulate import tabulate
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, create_db_engine, SQLITE_PRAGMAS
+from app.models import KeywordTerm, Note, NoteKeyword
+
+TERMS = ["딸기", "바닐라", "캐러멜", "피티 스모크", "사과", "꿀", "시나몬", "토피"]
+# scope별 keyword_terms id (seed_notes에서 채움)
+TERM_IDS = {}
+
+
+def seed_notes(Session, count: int):
+    db = Session()
+    for scope in ("nose", "palate"):
+        terms = [KeywordTerm(scope=scope, term=term) for term in TERMS]
+        db.add_all(terms)
+        db.flush()
+        TERM_IDS[scope] = [term.id for term in terms]
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        note = Note(name=f"Bench {i}", distillery=f"Distillery {i % 50}", created_at=start + timedelta(minutes=i))
+        note.keywords = [NoteKeyword(scope="nose", term_id=random.choice(TERM_IDS["nose"]), position=p) for p in range(3)]
+        db.add(note)
+    db.commit()
+    db.close()
+
+
+def worker(Session, stop_at: float, write_ratio: float, stats: dict, lock: threading.Lock):
+    reads = writes = errors = 0
+    while time.perf_counter() < stop_at:
+        db = Session()
+        try:
+            if random.random() < write_ratio:
+                note = Note(name="Bench write", distillery="Bench")
+                note.keywords = [NoteKeyword(scope="palate", term_id=random.choice(TERM_IDS["palate"]), position=0)]
+                db.add(note)
+                db.commit()
+                writes += 1
+            else:
+                db.query(Note).filter(Note.is_draft == False).order_by(
+                    Note.created_at.desc(), Note.id.desc()
+                ).limit(24).all()
+                reads += 1
+        except OperationalError:
+            db.rollback()
+            errors += 1
+        finally:
+            db.close()
+    with lock:
+        stats["reads"] += reads
+        stats["writes"] += writes
+        stats["errors"] += errors
+
+
+def run_profile(label: str, pragmas, threads: int, seconds: float, write_ratio: float, notes: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_db_engine(url, pragmas=pragmas, pool_size=threads, max_overflow=0)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        seed_notes(Session, notes)
+
+        stats = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        stop_at = time.perf_counter() + seconds
+        pool = [
+            threading.Thread(target=worker, args=(Session, stop_at, write_ratio, stats, lock))
+            for _ in range(threads)
+        ]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        engine.dispose()
+
+    total = stats["reads"] + stats["writes"]
+    return [
+        label,
+        f"{total / seconds:,.0f}",
+        f"{stats['reads'] / seconds:,.0f}",
+        f"{stats['writes'] / seconds:,.0f}",
+        stats["errors"],
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite profile concurrency benchmark")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--notes", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"threads={args.threads} seconds={args.seconds} write_ratio={args.write_ratio} notes={args.notes}")
+    print(f"tuned profile: {SQLITE_PRAGMAS}")
+    print()
+
+    rows = [
+        run_profile("default (rollback journal)", None, args.threads, args.seconds, args.write_ratio, args.notes),
+        run_profile("tuned (WAL)", SQLITE_PRAGMAS, args.threads, args.seconds, args.write_ratio, args.notes),
+    ]
+    print(tabulate(rows, headers=["profile", "ops/s", "reads/s", "writes/s", "lock errors"], tablefmt="github"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Static asset build (fingerprint + precompress)
+Run: python backend/build_static.py
+
+app/static의 파일을 내용 해시가 들어간 이름으로 app/static/dist에 복사하고
+(.css/.js 등은 .gz, brotli 설치 시 .br도 함께 생성) dist/manifest.json을 만듭니다.
+템플릿은 static_url('style.css')로 참조하므로 빌드 후 서버가 자동으로 새 경로를 사용합니다.
+빌드 결과가 없으면 원본 경로(/static/style.css)를 그대로 사용합니다.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.static_files import PRECOMPRESSED_EXTENSIONS
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 의존성 (없으면 .gz만 생성)
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "app", "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+SKIP_SUFFIXES = (".gz", ".br")
+
+
+def source_files():
+    for root, dirs, files in os.walk(STATIC_DIR):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != DIST_DIR]
+        for name in sorted(files):
+            if not name.endswith(SKIP_SUFFIXES):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, STATIC_DIR).replace(os.sep, "/"), path
+
+
+def main():
+    # 이전 빌드는 지우고 새로 생성 (manifest에 없는 파일이 남지 않도록)
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    manifest = {}
+    for name, path in source_files():
+        with open(path, "rb") as f:
+            content = f.read()
+        stem, ext = os.path.splitext(name)
+        built = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+        target = os.path.join(DIST_DIR, built)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(content)
+
+        variants = []
+        if ext in PRECOMPRESSED_EXTENSIONS:
+            with open(f"{target}.gz", "wb") as f:
+                f.write(gzip.compress(content, compresslevel=9, mtime=0))
+            variants.append(".gz")
+            if brotli:
+                with open(f"{target}.br", "wb") as f:
+                    f.write(brotli.compress(content))
+                variants.append(".br")
+
+        manifest[name] = built
+        print(f"[OK] {name} -> dist/{built} {' '.join(variants)}")
+
+    with open(os.path.join(DIST_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"\n{len(manifest)} files written to {DIST_DIR}")
+
+
+if __name__ == "__main__":
+    main()
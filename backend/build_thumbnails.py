@@ -0,0 +1,60 @@
+"""
+Thumbnail backfill (썸네일 / 중간 크기 파생 이미지 일괄 생성)
+Run: python backend/build_thumbnails.py [--force] [--workers 4]
+
+노트가 참조하는 모든 image_path에 대해 빠진 파생 이미지(WebP/JPEG)를 만듭니다.
+새로 업로드된 이미지는 서버가 자동으로 생성하므로 기존 이미지에만 필요합니다.
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.db import SessionLocal, init_db
+from app.models import Note
+from app.services.image_store import UPLOADS_DIR
+from app.services.thumbnail_service import ThumbnailService, THUMBNAIL_WORKERS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate thumbnail variants for existing note images")
+    parser.add_argument("--force", action="store_true", help="re-render variants that already exist")
+    parser.add_argument("--workers", type=int, default=THUMBNAIL_WORKERS)
+    args = parser.parse_args()
+
+    if not ThumbnailService.available():
+        print("[X] Pillow is not installed (pip install Pillow)")
+        sys.exit(1)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        paths = [path for (path,) in db.query(Note.image_path).filter(Note.image_path.isnot(None)).distinct()]
+    finally:
+        db.close()
+
+    existing = [p for p in paths if os.path.isfile(os.path.join(UPLOADS_DIR, p))]
+    missing = len(paths) - len(existing)
+    print(f"{len(existing)} images to check ({missing} referenced files missing)")
+
+    started = time.perf_counter()
+    written = failed = 0
+    for path, result in ThumbnailService.backfill(existing, force=args.force, workers=args.workers):
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"  [X] {path}: {result}")
+        else:
+            written += result
+    elapsed = time.perf_counter() - started
+
+    print(f"[OK] {written} variant files written in {elapsed:.1f}s")
+    if failed:
+        print(f"[X] {failed} images could not be decoded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
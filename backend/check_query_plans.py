@@ -0,0 +1,188 @@
+"""
+Hot query plan checker (EXPLAIN QUERY PLAN)
+Run: python backend/check_query_plans.py
+
+임시 DB에 현재 스키마를 만들고, 게시판/상세/Export 등에서 실제로 사용하는 쿼리를
+그대로 만들어 실행 계획을 확인합니다. 테이블 전체를 읽거나(SCAN, 커버링 인덱스로
+읽어도 마찬가지) 정렬용 임시 B-Tree를 만드는 쿼리가 있으면 종료 코드 1로 실패합니다.
+전체 집계가 목적인 쿼리만 allow_scan으로 명시해서 허용합니다.
+"""
+import os
+import re
+import sys
+import tempfile
+
+# 임시 DB를 사용하도록 app.db import 전에 경로 지정
+_tmp_dir = tempfile.TemporaryDirectory()
+os.environ["TASTING_NOTES_DB_PATH"] = os.path.join(_tmp_dir.name, "plan_check.db")
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from datetime import date, datetime
+from sqlalchemy import func, tuple_
+
+from app.db import Base, engine, init_db, SessionLocal
+from app.models import Note, NoteKeyword
+from app.services.cooccurrence_service import CooccurrenceService
+from app.services.board_service import BoardService, PAGE_SIZE
+from app.services.featured_service import FeaturedService
+from app.services.keyword_service import KeywordService
+from app.services.flavor_hierarchy import FlavorHierarchy
+from app.services.profile_service import ProfileService
+
+
+def explain(db, query):
+    """Return EXPLAIN QUERY PLAN detail lines for an ORM query or Core statement"""
+    statement = getattr(query, "statement", query)
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = [compiled.params[name] for name in compiled.positiontup]
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", tuple(params)).fetchall()
+    return [row[-1] for row in rows]
+
+
+# 별칭 테이블 (keyword_terms_1 등)
+_ALIAS_SUFFIX_RE = re.compile(r"_\d+$")
+
+
+def scanned_table(detail):
+    """Table a SCAN line reads in full, or None (index searches, subquery / co-routine results)"""
+    if not detail.startswith("SCAN "):
+        return None
+    name = detail.split()[1]
+    if name not in Base.metadata.tables:
+        name = _ALIAS_SUFFIX_RE.sub("", name)
+    return name if name in Base.metadata.tables else None
+
+
+def problems(plan, allow_sort=False, allow_scan=False):
+    """Plan lines that read a whole table (even through a covering index) or add a sort step"""
+    found = []
+    for detail in plan:
+        if not allow_scan and scanned_table(detail):
+            found.append(detail)
+        if not allow_sort and "USE TEMP B-TREE" in detail:
+            found.append(detail)
+    return found
+
+
+def hot_queries(db):
+    """(name, query, allow_sort, allow_scan) for every hot access path
+
+    allow_scan is only for full-table aggregates, which read every row by design.
+    """
+    queries = []
+    for sort_by in ("created_at", "name"):
+        for sort_order in ("desc", "asc"):
+            query, column, descending, _ = BoardService.build_query(db, sort_by, sort_order)
+            first = BoardService.ordered(query, column, descending).limit(PAGE_SIZE + 1)
+            queries.append((f"board first page ({sort_by} {sort_order})", first, False, False))
+
+            # 키셋 커서 이후 페이지
+            value = datetime(2024, 1, 1) if sort_by == "created_at" else "Lagavulin"
+            boundary = tuple_(column, Note.id)
+            after = boundary < tuple_(value, 100) if descending else boundary > tuple_(value, 100)
+            nxt = BoardService.ordered(query.filter(after), column, descending).limit(PAGE_SIZE + 1)
+            queries.append((f"board next page ({sort_by} {sort_order})", nxt, False, False))
+
+    # selectinload(Note.keywords)가 보내는 두 번째 쿼리와 같은 형태
+    queries.append((
+        "note keywords (selectinload)",
+        db.query(NoteKeyword).filter(NoteKeyword.note_id.in_([1, 2, 3])).order_by(NoteKeyword.position),
+        True,
+        False,
+    ))
+    queries.append((
+        "note keywords by scope",
+        db.query(NoteKeyword).filter(NoteKeyword.note_id == 1).order_by(NoteKeyword.scope, NoteKeyword.position),
+        False,
+        False,
+    ))
+    queries.append((
+        "notes by distillery",
+        db.query(Note.id).filter(Note.distillery == "Lagavulin"),
+        False,
+        False,
+    ))
+    # 자동완성 사용 빈도 캐시를 채우는 전체 집계 (5분마다 한 번)
+    queries.append((
+        "keyword usage by term id",
+        db.query(NoteKeyword.term_id, func.count()).group_by(NoteKeyword.term_id),
+        False,
+        True,
+    ))
+    queries.append((
+        "notes by keyword term id",
+        db.query(NoteKeyword.note_id).filter(NoteKeyword.term_id == 7),
+        False,
+        False,
+    ))
+    queries.append((
+        "notes under a flavor category",
+        db.query(Note.id).filter(Note.id.in_(FlavorHierarchy.note_ids({
+            "nose": ("딸기", "라즈베리", "레몬"), "palate": ("딸기", "사과"),
+        }))),
+        False,
+        False,
+    ))
+    queries.append((
+        "custom keywords page",
+        KeywordService.user_terms_query(db, "nose", after=(3, 10)).limit(31),
+        False,
+        False,
+    ))
+    queries.append((
+        "featured picks by offset",
+        FeaturedService.ids_at_offsets(db, [100, 3, 250]),
+        False,
+        False,
+    ))
+    queries.append((
+        "featured notes of the day",
+        FeaturedService.picks_query(db, date(2024, 1, 1)),
+        False,
+        False,
+    ))
+    # 바깥 정렬은 상위 N개씩 걸러진 결과(scope x level x N행)에만 적용
+    queries.append((
+        "profile top keywords",
+        ProfileService.top_keywords("distillery", "Lagavulin"),
+        True,
+        False,
+    ))
+    queries.append((
+        "related keywords",
+        CooccurrenceService.related_query(1),
+        False,
+        False,
+    ))
+    return queries
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    failures = 0
+    try:
+        for name, query, allow_sort, allow_scan in hot_queries(db):
+            plan = explain(db, query)
+            bad = problems(plan, allow_sort, allow_scan)
+            label = "FAIL" if bad else ("OK, full-table aggregate" if allow_scan else "OK")
+            print(f"[{label}] {name}")
+            for detail in plan:
+                print(f"       {detail}")
+            if bad:
+                failures += 1
+    finally:
+        db.close()
+        engine.dispose()
+
+    print()
+    if failures:
+        print(f"[X] {failures} hot queries regressed to a full scan or extra sort")
+        sys.exit(1)
+    print("[OK] All hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
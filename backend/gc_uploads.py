@@ -0,0 +1,57 @@
+"""
+Upload garbage collection (참조되지 않는 업로드 파일 정리)
+Run: python backend/gc_uploads.py [--grace-hours 24] [--dry-run]
+
+노트가 참조하지 않는 uploads 파일(교체/삭제된 이미지, 실패한 업로드의 임시 파일,
+예전 Export .txt)을 유예 기간이 지나면 격리 폴더로 옮기고, 격리 후 다시 유예 기간이
+지나면 삭제합니다. 서버도 UPLOAD_GC_INTERVAL_HOURS 주기로 같은 작업을 실행합니다.
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.db import SessionLocal, init_db
+from app.services.upload_gc import UploadGC, UPLOAD_GC_GRACE_SECONDS, QUARANTINE_DIR
+from app.services.image_store import UPLOADS_DIR
+
+
+def _size(num_bytes: int) -> str:
+    if num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f}KB"
+    return f"{num_bytes / (1024 * 1024):.1f}MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quarantine and delete unreferenced upload files")
+    parser.add_argument("--grace-hours", type=float, default=UPLOAD_GC_GRACE_SECONDS / 3600,
+                        help="minimum age before a file is quarantined, and before a quarantined file is deleted")
+    parser.add_argument("--dry-run", action="store_true", help="report without moving or deleting files")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        result = UploadGC.run(db, grace_seconds=int(args.grace_hours * 3600), dry_run=args.dry_run)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    if result is None:
+        print(f"[SKIP] Another upload GC run holds the lock in {QUARANTINE_DIR}")
+        sys.exit(1)
+
+    prefix = "[DRY RUN] " if args.dry_run else ""
+    print(f"{prefix}Scanned {result.scanned} files in {UPLOADS_DIR} ({elapsed:.1f}s)")
+    print(f"  kept:        {result.kept}")
+    print(f"  quarantined: {result.quarantined} ({_size(result.quarantined_bytes)}) -> {QUARANTINE_DIR}")
+    print(f"  restored:    {result.restored}")
+    print(f"  deleted:     {result.deleted}")
+    print(f"[OK] {prefix}{_size(result.reclaimed_bytes)} reclaimed")
+
+
+if __name__ == "__main__":
+    main()
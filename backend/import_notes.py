@@ -0,0 +1,52 @@
+"""
+Bulk note importer (JSONL / CSV)
+Run: python backend/import_notes.py notes.jsonl [more.csv ...] [--format jsonl|csv] [--batch-size 500]
+
+한 줄(행)에 노트 하나. 필드는 NoteCreate 스키마와 같고 created_at(선택)을 추가로 받습니다.
+CSV의 keywords 컬럼에는 KeywordDetail 목록을 JSON 배열로 넣습니다.
+잘못된 행은 건너뛰고 행 번호와 함께 출력합니다.
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.db import SessionLocal, init_db
+from app.services.import_service import ImportService, DEFAULT_BATCH_SIZE, IMPORT_FORMATS, detect_format, iter_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import tasting notes from JSONL or CSV")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    init_db()
+    failed = 0
+    db = SessionLocal()
+    try:
+        for path in args.paths:
+            fmt = detect_format(path, args.format)
+            started = time.perf_counter()
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                result = ImportService.import_notes(db, iter_records(f, fmt), batch_size=args.batch_size)
+            elapsed = time.perf_counter() - started
+
+            print(f"[OK] {path}: {result.imported} notes imported in {elapsed:.1f}s")
+            for error in result.errors:
+                print(f"  [X] row {error.row}: {error.error}")
+            failed += len(result.errors)
+    finally:
+        db.close()
+
+    if failed:
+        print(f"\n[X] {failed} rows skipped")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
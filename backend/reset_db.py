@@ -8,11 +8,9 @@ import sys
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
-from app.db import init_db
+from app.db import init_db, DB_PATH
 from app.seed import seed_vocabulary
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "app", "tasting_notes.db")
-
 
 def reset_database():
     """데이터베이스를 삭제하고 새로 생성"""
@@ -27,6 +25,10 @@ def reset_database():
         print(f"   경로: {DB_PATH}")
         try:
             os.remove(DB_PATH)
+            # WAL 모드의 보조 파일
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(DB_PATH + suffix):
+                    os.remove(DB_PATH + suffix)
             print("   ✓ 삭제 완료")
         except Exception as e:
             print(f"   ✗ 오류 발생: {e}")
@@ -0,0 +1,142 @@
+"""
+Per-route query budgets
+Run: python -m pytest backend/tests
+
+임시 DB에 노트를 N개, 2N개 만들어 예산이 걸린 라우트를 호출하고, X-Query-Count가
+@query_budget 이하이며 노트 수에 따라 늘어나지 않는지(N+1이 없는지) 확인합니다.
+프로세스 캐시를 비운 첫 요청(하루 추천 선정, 어휘 / 유사도 인덱스 빌드)도 함께 확인합니다.
+"""
+import json
+import os
+import sys
+import tempfile
+
+# 임시 DB / 업로드 폴더와 strict 모드를 app import 전에 지정
+_tmp_dir = tempfile.TemporaryDirectory()
+os.environ["TASTING_NOTES_DB_PATH"] = os.path.join(_tmp_dir.name, "query_budget.db")
+os.environ["TASTING_NOTES_UPLOADS_DIR"] = os.path.join(_tmp_dir.name, "uploads")
+os.environ["QUERY_BUDGET_STRICT"] = "1"
+os.environ["UPLOAD_GC_INTERVAL_HOURS"] = "0"
+os.makedirs(os.environ["TASTING_NOTES_UPLOADS_DIR"], exist_ok=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import SessionLocal
+from app.main import app
+from app.models import FeaturedPick
+from app.services.export_service import ExportService
+from app.services.featured_service import FeaturedService
+from app.services.flavor_hierarchy import FlavorHierarchy
+from app.services.similar_service import SimilarService
+from app.services.suggest_service import KeywordSuggestService
+from app.services.vocabulary_cache import VocabularyCache
+
+N = 15
+
+# (route path, requested URL)
+CASES = [
+    ("/", "/"),
+    ("/", "/?view=list&sort_by=score&sort_order=asc"),
+    ("/", "/?search=바닐라"),
+    ("/", "/?search=과일&search_mode=OR"),
+    ("/notes/new", "/notes/new"),
+    ("/notes/{note_id}", "/notes/1"),
+    ("/notes/{note_id}/edit", "/notes/1/edit"),
+    ("/api/notes/page", "/api/notes/page"),
+    ("/api/notes/page", "/api/notes/page?search=과일"),
+    ("/api/vocabulary", "/api/vocabulary"),
+    ("/api/keywords/custom", "/api/keywords/custom?scope=finish"),
+    ("/api/keywords/suggest", "/api/keywords/suggest?scope=nose&q=바"),
+    ("/api/keywords/related", "/api/keywords/related?scope=nose&term=바닐라"),
+    ("/api/notes/{note_id}/similar", "/api/notes/1/similar"),
+    ("/api/stats/profile", "/api/stats/profile"),
+    ("/api/stats/profile", "/api/stats/profile?value=Distillery 1"),
+    ("/notes/{note_id}/export.txt", "/notes/1/export.txt"),
+]
+
+BUDGETS = {
+    route.path: route.endpoint.__query_budget__
+    for route in app.routes
+    if hasattr(getattr(route, "endpoint", None), "__query_budget__")
+}
+
+
+def keyword(scope, term, position):
+    return {"scope": scope, "term": term, "icon_key": "🍓", "detail_text": "", "position": position, "source_type": "vocabulary"}
+
+
+def add_notes(client, start, count):
+    for i in range(start, start + count):
+        keywords = [
+            keyword("nose", "바닐라", 0),
+            keyword("nose", "사과", 1),
+            keyword("palate", "꿀", 0),
+            dict(keyword("finish", f"여운 {i % 4}", 0), source_type="user"),
+        ]
+        response = client.post("/api/notes", data={
+            "name": f"Note {i}",
+            "distillery": f"Distillery {i % 3}",
+            "cask_type": "Sherry" if i % 2 else "Bourbon",
+            "score": str(70 + i % 30),
+            "is_draft": "true" if i % 5 == 4 else "false",
+            "keywords_json": json.dumps(keywords),
+        })
+        assert response.status_code == 200, response.text
+
+
+def reset_caches():
+    """프로세스 캐시(추천, 어휘, 자동완성, 유사도, Export)와 오늘의 추천을 비워 다음 요청이 처음부터 다시 만들게 함"""
+    FeaturedService._ensured = None
+    SimilarService._index = None
+    FlavorHierarchy._map = None
+    VocabularyCache.invalidate()
+    KeywordSuggestService.invalidate()
+    with ExportService._cache_lock:
+        ExportService._cache.clear()
+    with SessionLocal() as db:
+        db.query(FeaturedPick).delete()
+        db.commit()
+
+
+def query_counts(client):
+    """url -> (cold, warm) X-Query-Count"""
+    counts = {}
+    for _, url in CASES:
+        reset_caches()
+        cold = client.get(url)
+        warm = client.get(url)
+        assert cold.status_code == 200 and warm.status_code == 200, url
+        counts[url] = (int(cold.headers["X-Query-Count"]), int(warm.headers["X-Query-Count"]))
+    return counts
+
+
+@pytest.fixture(scope="module")
+def counts():
+    with TestClient(app) as client:
+        add_notes(client, 0, N)
+        small = query_counts(client)
+        add_notes(client, N, N)
+        large = query_counts(client)
+    return small, large
+
+
+def test_every_case_has_a_budget():
+    for path, url in CASES:
+        assert path in BUDGETS, url
+
+
+@pytest.mark.parametrize("path,url", CASES)
+def test_within_budget(counts, path, url):
+    for by_url in counts:
+        cold, warm = by_url[url]
+        assert cold <= BUDGETS[path], f"{url}: {cold} statements on a cold cache (budget {BUDGETS[path]})"
+        assert warm <= BUDGETS[path], f"{url}: {warm} statements (budget {BUDGETS[path]})"
+
+
+@pytest.mark.parametrize("path,url", CASES)
+def test_does_not_grow_with_notes(counts, path, url):
+    small, large = counts
+    assert small[url] == large[url], f"{url}: {small[url]} with {N} notes, {large[url]} with {2 * N}"